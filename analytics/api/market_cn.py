@@ -20,7 +20,9 @@ router = APIRouter(tags=["中国市场"])
 def get_fear_greed_index(symbol: str = "sh000001", days: int = 14) -> Dict[str, Any]:
     """获取中国市场恐慌贪婪指数"""
     try:
-        return CNFearGreedIndex.calculate(symbol=symbol, days=days)
+        return CNFearGreedIndex.with_explanation(
+            CNFearGreedIndex.calculate(symbol=symbol, days=days)
+        )
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
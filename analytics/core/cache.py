@@ -8,17 +8,54 @@ Redis 缓存模块
 
 import json
 import hashlib
+import orjson
 import redis
+import zstandard as zstd
 from redis import ConnectionPool
 import time
+import random
 import threading
+from collections import OrderedDict
 from functools import wraps
-from typing import Optional, Any, Callable, Dict
+from typing import Optional, Any, Callable, Dict, Tuple
 from datetime import datetime
 from .config import settings
+from .logger import logger
 
 # 缓存版本号：当缓存数据结构变化时递增，自动使旧缓存失效
-CACHE_VERSION = "v2"
+CACHE_VERSION = "v3"
+
+# 进程内 L1 缓存的最长寿命 (秒)，实际值为 min(L1_MAX_TTL, ttl / 10)
+# 热点接口在同一 worker 内的重复读取无需每次往返 Redis
+L1_MAX_TTL = 5
+
+# 进程内 L1 缓存的最大条目数 (LRU 淘汰)，避免一次性参数组合常驻内存
+L1_MAX_ENTRIES = 256
+
+# 缓存负载编码: orjson 序列化 + zstd 压缩 (level 3 兼顾速度与压缩率)
+ZSTD_LEVEL = 3
+_ORJSON_OPTS = orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+
+
+def encode_payload(value: Any) -> bytes:
+    """序列化并压缩缓存值"""
+    return zstd.ZstdCompressor(level=ZSTD_LEVEL).compress(
+        orjson.dumps(value, default=str, option=_ORJSON_OPTS)
+    )
+
+
+def decode_payload(blob: bytes) -> Any:
+    """解压并反序列化缓存值"""
+    return orjson.loads(zstd.ZstdDecompressor().decompress(blob))
+
+
+# 写入时对 TTL 做 ±10% 抖动，避免同批写入的键在同一秒集中过期、同时回源
+TTL_JITTER = 0.1
+
+
+def jitter_ttl(ttl: float) -> int:
+    """返回带随机抖动的 TTL (秒，至少为 1)"""
+    return max(1, int(ttl * random.uniform(1 - TTL_JITTER, 1 + TTL_JITTER)))
 
 
 class RedisCache:
@@ -36,8 +73,13 @@ class RedisCache:
         """
         self.redis_url = redis_url or settings.REDIS_URL
         self._redis: Optional[redis.Redis] = None
+        self._raw: Optional[redis.Redis] = None
         self._connected = False
         self._inflight_tasks = set() # Track keys currently being refreshed locally
+        self._inflight_lock = threading.Lock()
+        # 进程内 L1 缓存 (LRU): key -> (monotonic 过期时间, 值)
+        self._local: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+        self._local_lock = threading.Lock()
 
     @classmethod
     def get_instance(cls) -> "RedisCache":
@@ -71,7 +113,7 @@ class RedisCache:
                 self._redis.ping()
                 self._connected = True
             except redis.ConnectionError as e:
-                print(f"⚠️ Redis 连接失败: {e}，将使用无缓存模式")
+                logger.warning(f"⚠️ Redis 连接失败: {e}，将使用无缓存模式")
                 self._connected = False
         if self._redis is None:
             # Try to connect if lazy initialization
@@ -84,6 +126,76 @@ class RedisCache:
 
         return self._redis
 
+    @property
+    def raw(self) -> redis.Redis:
+        """不解码响应的 Redis 客户端，用于读写压缩后的缓存负载"""
+        if self._raw is None:
+            self._raw = redis.Redis.from_url(
+                self.redis_url,
+                max_connections=50,
+                socket_connect_timeout=3,
+                socket_timeout=3,
+                retry_on_timeout=True,
+                health_check_interval=30,
+            )
+        return self._raw
+
+    def claim_refresh(self, key: str) -> bool:
+        """
+        原子地登记本进程内的刷新任务 (Single-Flight)
+
+        检查与登记必须在同一把锁内完成，否则并发的 cache miss
+        会在后台线程登记前各自启动一个刷新线程。
+
+        Returns:
+            bool: True 表示本次调用获得了刷新权
+        """
+        with self._inflight_lock:
+            if key in self._inflight_tasks:
+                return False
+            self._inflight_tasks.add(key)
+            return True
+
+    def release_refresh(self, key: str) -> None:
+        """释放本进程内的刷新登记"""
+        with self._inflight_lock:
+            self._inflight_tasks.discard(key)
+
+    def get_local(self, key: str) -> Optional[Any]:
+        """读取进程内 L1 缓存，过期返回 None"""
+        with self._local_lock:
+            entry = self._local.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if time.monotonic() < expires_at:
+                self._local.move_to_end(key)
+                return value
+            del self._local[key]
+            return None
+
+    def set_local(self, key: str, value: Any, ttl: float) -> None:
+        """写入进程内 L1 缓存，顺带清理已过期条目，超出容量时淘汰最久未使用的条目"""
+        if ttl <= 0:
+            return
+        now = time.monotonic()
+        with self._local_lock:
+            expired = [k for k, (expires_at, _) in self._local.items() if expires_at <= now]
+            for k in expired:
+                del self._local[k]
+            self._local[key] = (now + ttl, value)
+            self._local.move_to_end(key)
+            while len(self._local) > L1_MAX_ENTRIES:
+                self._local.popitem(last=False)
+
+    def clear_local(self, key: Optional[str] = None) -> None:
+        """清除进程内 L1 缓存 (key 为空时全部清除)"""
+        with self._local_lock:
+            if key is None:
+                self._local.clear()
+            else:
+                self._local.pop(key, None)
+
     @property
     def connected(self) -> bool:
         """检查是否已连接"""
@@ -96,39 +208,43 @@ class RedisCache:
         if not self.connected:
             return None
         try:
-            value = self.redis.get(key)
+            value = self.raw.get(key)
             if value:
-                return json.loads(value)
-        except (redis.RedisError, json.JSONDecodeError) as e:
-            print(f"缓存读取失败 [{key}]: {e}")
+                return decode_payload(value)
+        except (redis.RedisError, orjson.JSONDecodeError, zstd.ZstdError) as e:
+            logger.warning(f"缓存读取失败 [{key}]: {e}")
         return None
 
     def set(self, key: str, value: Any, ttl: int = 60) -> bool:
         """设置缓存值"""
         if not self.connected:
+            self.clear_local(key)
             return False
         try:
-            self.redis.setex(
-                key, ttl, json.dumps(value, ensure_ascii=False, default=str)
-            )
+            self.raw.setex(key, ttl, encode_payload(value))
             return True
         except (redis.RedisError, TypeError) as e:
-            print(f"缓存写入失败 [{key}]: {e}")
+            logger.warning(f"缓存写入失败 [{key}]: {e}")
+        finally:
+            # 写入 Redis 之后再清 L1: 若先清，读者可能在写入前把旧值重新放回 L1
+            self.clear_local(key)
         return False
 
     def delete(self, key: str) -> bool:
         """删除缓存"""
+        self.clear_local(key)
         if not self.connected:
             return False
         try:
             self.redis.delete(key)
             return True
         except redis.RedisError as e:
-            print(f"缓存删除失败 [{key}]: {e}")
+            logger.warning(f"缓存删除失败 [{key}]: {e}")
         return False
 
     def delete_pattern(self, pattern: str) -> int:
         """批量删除"""
+        self.clear_local()
         if not self.connected:
             return 0
         try:
@@ -136,7 +252,7 @@ class RedisCache:
             if keys:
                 return self.redis.delete(*keys)
         except redis.RedisError as e:
-            print(f"批量删除失败 [{pattern}]: {e}")
+            logger.warning(f"批量删除失败 [{pattern}]: {e}")
         return 0
 
     def get_stats(self) -> dict:
@@ -268,16 +384,29 @@ def cached(key_prefix: str, ttl: int = 60, stale_ttl: Optional[int] = None):
         @cached("market:overview", ttl=60, stale_ttl=300)
     """
 
+    l1_ttl = min(L1_MAX_TTL, ttl / 10)
+
     def decorator(func: Callable) -> Callable:
         @wraps(func)
         def wrapper(*args, **kwargs):
             # 1. 生成缓存 key
             cache_key = make_cache_key(key_prefix, *args, **kwargs)
 
-            # 2. 尝试获取缓存
-            cached_data = cache.get(cache_key)
-
+            # 2. 尝试获取缓存 (L1 进程内 -> L2 Redis)
             now = time.time()
+            cached_data = cache.get_local(cache_key)
+            if cached_data is None:
+                cached_data = cache.get(cache_key)
+                if cached_data is not None:
+                    # 只缓存仍新鲜的数据，且 L1 过期时间不超过逻辑过期时间:
+                    # 陈旧数据留在 L1 会让本进程在别人刷新完成后仍反复触发刷新
+                    if isinstance(cached_data, dict) and "_meta" in cached_data:
+                        remaining = cached_data["_meta"].get("expire_at", 0) - now
+                        if remaining > 0:
+                            cache.set_local(cache_key, cached_data, min(l1_ttl, remaining))
+                    else:
+                        cache.set_local(cache_key, cached_data, l1_ttl)
+
             should_refresh = False
             return_stale = False
 
@@ -335,11 +464,9 @@ def cached(key_prefix: str, ttl: int = 60, stale_ttl: Optional[int] = None):
                 # 2. 只有在此进程中未运行任务时才启动新线程 (减少开销)
                 # 3. 利用 Redis 锁确保分布式环境下的单一执行
                 
-                if cache_key not in cache._inflight_tasks:
-                    
+                if cache.claim_refresh(cache_key):
+
                     def async_refresh_task():
-                        # 标记开始
-                        cache._inflight_tasks.add(cache_key)
                         lock_key = f"refresh:{cache_key}"
                         lock = None
                         try:
@@ -347,14 +474,13 @@ def cached(key_prefix: str, ttl: int = 60, stale_ttl: Optional[int] = None):
                             lock = cache.lock(lock_key, timeout=60, blocking_timeout=0)
                             if lock.acquire(blocking=False):
                                 try:
-                                    # Double check (虽然是非阻塞，但在获取锁的过程中可能已有别人更新)
-                                    # 仅针对 Cold Start 需要 check，Stale Refresh 无所谓
-                                    if not return_stale:
-                                        fresh_data = cache.get(cache_key)
-                                        if fresh_data and "_meta" in fresh_data and time.time() < fresh_data["_meta"]["expire_at"]:
-                                            return
-
-                                    print(f"⚡ [Async] 开始计算: {key_prefix}")
+                                    # Double check: 拿到锁之前可能已有别人完成刷新并释放了锁
+                                    # (冷启动与陈旧刷新都需要检查，否则会重复请求上游)
+                                    fresh_data = cache.get(cache_key)
+                                    if fresh_data and "_meta" in fresh_data and time.time() < fresh_data["_meta"]["expire_at"]:
+                                        return
+
+                                    logger.info(f"⚡ [Async] 开始计算: {key_prefix}")
                                     result = func(*args, **kwargs)
 
                                     if result is not None:
@@ -374,21 +500,22 @@ def cached(key_prefix: str, ttl: int = 60, stale_ttl: Optional[int] = None):
                                             # 写入缓存
                                             current_now = time.time()
                                             
-                                            # 物理 TTL
-                                            p_ttl = ttl + (stale_ttl if stale_ttl else 0)
+                                            # 逻辑 TTL 加抖动，物理 TTL 随之顺延
+                                            l_ttl = jitter_ttl(ttl)
+                                            p_ttl = l_ttl + (stale_ttl if stale_ttl else 0)
                                             
                                             val = {
                                                 "_meta": {
-                                                    "expire_at": current_now + ttl,
+                                                    "expire_at": current_now + l_ttl,
                                                     "cached_at": current_now,
                                                     "ttl": ttl
                                                 },
                                                 "data": result
                                             }
                                             cache.set(cache_key, val, p_ttl)
-                                            print(f"✅ [Async] 缓存更新完成: {key_prefix}")
+                                            logger.info(f"✅ [Async] 缓存更新完成: {key_prefix}")
                                         else:
-                                            print(f"⚠️ [Async] 计算结果无效，忽略: {key_prefix}")
+                                            logger.warning(f"⚠️ [Async] 计算结果无效，忽略: {key_prefix}")
 
                                 finally:
                                     try:
@@ -399,11 +526,9 @@ def cached(key_prefix: str, ttl: int = 60, stale_ttl: Optional[int] = None):
                                 # 未获取到锁，说明其他节点正在计算
                                 pass
                         except Exception as e:
-                            print(f"❌ [Async] 后台刷新任务异常: {e}")
+                            logger.error(f"❌ [Async] 后台刷新任务异常: {e}")
                         finally:
-                            # 标记结束
-                            if cache_key in cache._inflight_tasks:
-                                cache._inflight_tasks.remove(cache_key)
+                            cache.release_refresh(cache_key)
 
                     # 启动后台线程
                     threading.Thread(target=async_refresh_task, daemon=True).start()
@@ -457,7 +582,7 @@ def warmup_cache(func: Callable, *args, **kwargs) -> bool:
                         has_valid_data = True
                         break
                 if not has_valid_data:
-                    print(f"⚠️ 预热检测到错误结果，跳过缓存: {func.__name__} - {result.get('error', 'Unknown')}")
+                    logger.warning(f"⚠️ 预热检测到错误结果，跳过缓存: {func.__name__} - {result.get('error', 'Unknown')}")
                     return False
 
             now = time.time()
@@ -466,17 +591,18 @@ def warmup_cache(func: Callable, *args, **kwargs) -> bool:
             stale = getattr(func, "_cache_stale_ttl", 0) or 0
 
             if prefix is None or ttl is None:
-                print(f"❌ 缓存预热失败 [{func.__name__}]: 缺少缓存元数据")
+                logger.error(f"❌ 缓存预热失败 [{func.__name__}]: 缺少缓存元数据")
                 return False
 
             key = make_cache_key(prefix, *args, **kwargs)
 
-            val = {"_meta": {"expire_at": now + ttl, "cached_at": now, "ttl": ttl}, "data": result}
-            cache.set(key, val, ttl + stale)
-            print(f"✅ 缓存预热成功: {prefix}")
+            l_ttl = jitter_ttl(ttl)
+            val = {"_meta": {"expire_at": now + l_ttl, "cached_at": now, "ttl": ttl}, "data": result}
+            cache.set(key, val, l_ttl + stale)
+            logger.info(f"✅ 缓存预热成功: {prefix}")
             return True
     except Exception as e:
-        print(f"❌ 缓存预热失败 [{func.__name__}]: {e}")
+        logger.error(f"❌ 缓存预热失败 [{func.__name__}]: {e}")
     
     # === 故障保护逻辑 ===
     # 如果预热失败（无论是 validation 失败还是 Exception），尝试延长现有缓存的寿命
@@ -498,9 +624,9 @@ def warmup_cache(func: Callable, *args, **kwargs) -> bool:
                  # 重新 सेट (SETEX)
                  # 内容不变，只更新过期时间
                  cache.set(key, cached_val, physical_ttl)
-                 print(f"🛡️ [预热保护] 已延长现有缓存寿命: {prefix}")
+                 logger.info(f"🛡️ [预热保护] 已延长现有缓存寿命: {prefix}")
                  return True # 虽然预热新数据失败，但保护了老数据，算作"处理成功"
     except Exception as protect_err:
-        print(f"⚠️ [预热保护] 执行失败: {protect_err}")
+        logger.warning(f"⚠️ [预热保护] 执行失败: {protect_err}")
 
     return False
@@ -30,6 +30,9 @@ class Settings:
     DATABASE_URL = os.getenv("DATABASE_URL")
     CACHE_PREFIX = "xanalytics"
 
+    # 启动时是否在后台预热缓存 (多实例部署时可只在一个实例开启)
+    WARM_CACHE_ON_STARTUP = os.getenv("WARM_CACHE_ON_STARTUP", "true").lower() in ("1", "true", "yes")
+
     # 交易时间配置 (北京时间)
     TRADING_HOURS: Dict[str, Dict[str, Any]] = {
         "market_cn": {
@@ -7,7 +7,8 @@ import akshare as ak
 import pandas as pd
 import threading
 import time
-from typing import Optional, Callable, Any, Dict
+from typing import Optional, Callable, Any, Dict, Tuple
+from .logger import logger
 
 
 class SharedDataProvider:
@@ -34,6 +35,10 @@ class SharedDataProvider:
         self.memory_cache_ttl = memory_cache_ttl
         self._cache: Dict[str, Dict[str, Any]] = {}
         self._cache_lock = threading.Lock()
+        # 每个缓存键一把请求锁: 并发未命中时只有一个线程请求上游，其余等待后复用结果
+        self._fetch_locks: Dict[str, threading.Lock] = {}
+        # 按日期增量更新的时间序列缓存: key -> (覆盖的窗口起点, 按日期排序的数据)
+        self._series_cache: Dict[str, Tuple[pd.Timestamp, pd.DataFrame]] = {}
 
     @classmethod
     def get_instance(cls) -> "SharedDataProvider":
@@ -50,7 +55,7 @@ class SharedDataProvider:
             if key in self._cache:
                 entry = self._cache[key]
                 if time.time() - entry["timestamp"] < self.memory_cache_ttl:
-                    print(f"📦 使用内存缓存: {key}")
+                    logger.debug(f"📦 使用内存缓存: {key}")
                     return entry["data"]
                 else:
                     # 过期，删除
@@ -65,6 +70,76 @@ class SharedDataProvider:
                 "timestamp": time.time(),
             }
 
+    def _get_or_fetch(self, key: str, label: str, func: Callable, *args, **kwargs) -> Any:
+        """读取内存缓存，未命中时单飞请求 (同一键同时只有一个上游请求)"""
+        cached = self._get_cached(key)
+        if cached is not None:
+            return cached
+
+        with self._cache_lock:
+            fetch_lock = self._fetch_locks.setdefault(key, threading.Lock())
+
+        with fetch_lock:
+            # 等锁期间其他线程可能已完成请求
+            cached = self._get_cached(key)
+            if cached is not None:
+                return cached
+
+            logger.info(f"🌐 请求{label}...")
+            data = self._fetch_with_retry(func, *args, **kwargs)
+            self._set_cached(key, data)
+            return data
+
+    def _get_incremental(
+        self,
+        key: str,
+        label: str,
+        fetch_since: Callable[[str], pd.DataFrame],
+        start_str: str,
+        date_col: str = "日期",
+    ) -> pd.DataFrame:
+        """
+        按日期增量获取时间序列 (同一键同时只有一个上游请求)
+
+        已缓存的窗口覆盖请求起点时，只补拉缓存最后一天 (当日数值可能仍在更新) 之后的增量，
+        与缓存按日期合并后再裁剪到请求窗口；增量请求失败时沿用缓存。
+
+        Args:
+            fetch_since: 接收起始日期 (YYYYMMDD)，返回 date_col 已转为 datetime 的数据
+            start_str: 请求窗口起点 (YYYYMMDD)
+        """
+        start_ts = pd.Timestamp(start_str)
+
+        with self._cache_lock:
+            fetch_lock = self._fetch_locks.setdefault(key, threading.Lock())
+
+        with fetch_lock:
+            with self._cache_lock:
+                cached_start, cached_df = self._series_cache.get(key, (None, None))
+
+            incremental = cached_df is not None and not cached_df.empty and cached_start <= start_ts
+            fetch_start = cached_df[date_col].max().strftime("%Y%m%d") if incremental else start_str
+
+            logger.info(f"🌐 请求{label} (自 {fetch_start})...")
+            try:
+                df = fetch_since(fetch_start)
+            except Exception:
+                if not incremental:
+                    raise
+                logger.warning(f"⚠️ {label}增量请求失败，沿用缓存")
+                df = pd.DataFrame()
+
+            if incremental:
+                df = pd.concat([cached_df, df]).drop_duplicates(date_col, keep="last") if date_col in df.columns else cached_df
+
+            if date_col in df.columns:
+                df = df.sort_values(date_col)
+                df = df[df[date_col] >= start_ts]
+                with self._cache_lock:
+                    self._series_cache[key] = (start_ts, df)
+
+            return df
+
     def _fetch_with_retry(self, func: Callable, *args, **kwargs) -> Any:
         """使用带重试和节流的机制获取数据"""
         from .utils import akshare_call_with_retry
@@ -83,16 +158,7 @@ class SharedDataProvider:
         - dividend.py (红利策略)
         - 其他需要全市场数据的模块
         """
-        cache_key = "stock_zh_a_spot_em"
-        cached = self._get_cached(cache_key)
-        if cached is not None:
-            return cached
-
-        print("🌐 请求 A 股实时行情...")
-        # 使用带重试的调用
-        df = self._fetch_with_retry(ak.stock_zh_a_spot_em)
-        self._set_cached(cache_key, df)
-        return df
+        return self._get_or_fetch("stock_zh_a_spot_em", " A 股实时行情", ak.stock_zh_a_spot_em)
 
     def get_board_industry_name(self) -> pd.DataFrame:
         """
@@ -102,15 +168,9 @@ class SharedDataProvider:
         - leaders.py (领涨领跌)
         - market.py (板块分析)
         """
-        cache_key = "stock_board_industry_name_em"
-        cached = self._get_cached(cache_key)
-        if cached is not None:
-            return cached
-
-        print("🌐 请求行业板块数据...")
-        df = self._fetch_with_retry(ak.stock_board_industry_name_em)
-        self._set_cached(cache_key, df)
-        return df
+        return self._get_or_fetch(
+            "stock_board_industry_name_em", "行业板块数据", ak.stock_board_industry_name_em
+        )
     
     def get_sector_constituents(self, sector_name: str) -> pd.DataFrame:
         """
@@ -119,15 +179,12 @@ class SharedDataProvider:
         Args:
             sector_name: 板块名称 (e.g. "贵金属")
         """
-        cache_key = f"stock_board_industry_cons_em:{sector_name}"
-        cached = self._get_cached(cache_key)
-        if cached is not None:
-            return cached
-
-        print(f"🌐 请求板块成分股: {sector_name}...")
-        df = self._fetch_with_retry(ak.stock_board_industry_cons_em, symbol=sector_name)
-        self._set_cached(cache_key, df)
-        return df
+        return self._get_or_fetch(
+            f"stock_board_industry_cons_em:{sector_name}",
+            f"板块成分股: {sector_name}",
+            ak.stock_board_industry_cons_em,
+            symbol=sector_name,
+        )
 
     def get_index_spot(self, symbol: str = "沪深重要指数") -> pd.DataFrame:
         """
@@ -136,21 +193,66 @@ class SharedDataProvider:
         Args:
             symbol: 指数类型
         """
-        cache_key = f"stock_zh_index_spot_em:{symbol}"
-        cached = self._get_cached(cache_key)
-        if cached is not None:
-            return cached
+        return self._get_or_fetch(
+            f"stock_zh_index_spot_em:{symbol}", f"指数行情: {symbol}", ak.stock_zh_index_spot_em, symbol=symbol
+        )
+
+    def get_us_daily(self, symbol: str, adjust: str = "") -> pd.DataFrame:
+        """
+        获取美股/美股指数日线 (新浪)
+
+        多个模块共享:
+        - fear_greed.py (VIX / 标普500 / 道琼斯 / 纳斯达克)
+        - leaders.py (中概股 PGJ)
+
+        Args:
+            symbol: 代码 (e.g. ".INX", ".VIX", "PGJ")
+            adjust: 复权方式，"" 为不复权，"qfq" 为前复权
+        """
+        return self._get_or_fetch(
+            f"stock_us_daily:{symbol}:{adjust}",
+            f"美股日线: {symbol}",
+            ak.stock_us_daily,
+            symbol=symbol,
+            adjust=adjust,
+        )
+
+    def get_bond_china_yield(self, start_date: str, end_date: str) -> pd.DataFrame:
+        """
+        获取中债国债收益率曲线 (按日期增量更新)
+
+        只保留 "中债国债收益率曲线"，日期列转为 datetime 并升序排列。
+
+        Args:
+            start_date: 起始日期 (YYYYMMDD)
+            end_date: 结束日期 (YYYYMMDD)
+        """
+
+        def fetch_since(fetch_start: str) -> pd.DataFrame:
+            df = self._fetch_with_retry(ak.bond_china_yield, start_date=fetch_start, end_date=end_date)
+            if df.empty:
+                return df
+            # 过滤只保留国债: 曲线名称只有少数几种取值，转为分类后按整数编码比较，
+            # 不必逐行比较字符串；缓存中的该列也随之变为紧凑的分类存储
+            if "曲线名称" in df.columns:
+                curve_names = df["曲线名称"].astype("category")
+                if "中债国债收益率曲线" in curve_names.cat.categories:
+                    target = curve_names.cat.categories.get_loc("中债国债收益率曲线")
+                    df = df.assign(曲线名称=curve_names)[curve_names.cat.codes.to_numpy() == target]
+                else:
+                    df = df.iloc[0:0]
+            if "日期" in df.columns:
+                df["日期"] = pd.to_datetime(df["日期"])
+            return df
 
-        print(f"🌐 请求指数行情: {symbol}...")
-        df = self._fetch_with_retry(ak.stock_zh_index_spot_em, symbol=symbol)
-        self._set_cached(cache_key, df)
-        return df
+        return self._get_incremental("bond_china_yield", "中债国债收益率曲线", fetch_since, start_date)
 
     def clear_cache(self) -> int:
         """清除所有内存缓存"""
         with self._cache_lock:
-            count = len(self._cache)
+            count = len(self._cache) + len(self._series_cache)
             self._cache.clear()
+            self._series_cache.clear()
             return count
 
     def get_stats(self) -> dict:
@@ -0,0 +1,66 @@
+"""
+共享数值计算内核
+numba 可用时 JIT 编译为机器码，未安装时 njit 退化为空装饰器 (结果一致)
+
+各市场模块的数值内核统一从这里导入 njit，避免各自维护一份降级逻辑。
+
+注意: numba 不在 requirements.txt 中，默认镜像里 njit 是空装饰器，
+显式签名与 cache=True 均不生效；需要加速时在部署环境中自行安装 numba。
+"""
+
+import numpy as np
+
+try:
+    from numba import njit
+except ImportError:  # numba 为可选依赖
+    def njit(*args, **kwargs):
+        """numba.njit 的空实现: 原样返回被装饰函数"""
+        if len(args) == 1 and callable(args[0]) and not kwargs:
+            return args[0]
+
+        def decorator(func):
+            return func
+
+        return decorator
+
+
+@njit("float64(float64[:], int64)", cache=True)
+def rsi_wilder(close: np.ndarray, period: int) -> float:
+    """
+    Wilder RSI (单次遍历)
+
+    以前 period 个差值的简单均值为初值，之后按
+    avg = (avg * (period - 1) + x) / period 递推平滑。
+
+    Returns:
+        最新一期 RSI；差值不足 period 个、价格中含 NaN、或区间无涨跌时返回 NaN
+    """
+    n = close.shape[0]
+    if n - 1 < period:
+        return np.nan
+
+    avg_gain = 0.0
+    avg_loss = 0.0
+    for i in range(1, period + 1):
+        delta = close[i] - close[i - 1]
+        if np.isnan(delta):
+            return np.nan
+        if delta > 0.0:
+            avg_gain += delta
+        elif delta < 0.0:
+            avg_loss -= delta
+    avg_gain /= period
+    avg_loss /= period
+
+    for i in range(period + 1, n):
+        delta = close[i] - close[i - 1]
+        if np.isnan(delta):
+            return np.nan
+        gain = delta if delta > 0.0 else 0.0
+        loss = -delta if delta < 0.0 else 0.0
+        avg_gain = (avg_gain * (period - 1) + gain) / period
+        avg_loss = (avg_loss * (period - 1) + loss) / period
+
+    if avg_loss == 0.0:
+        return 100.0 if avg_gain > 0.0 else np.nan
+    return 100.0 - 100.0 / (1.0 + avg_gain / avg_loss)
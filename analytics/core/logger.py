@@ -10,11 +10,13 @@ from loguru import logger
 logger.remove()
 
 # 添加控制台 handler (带颜色)
+# enqueue=True: 日志经队列由后台线程写出，调用方不会阻塞在 stderr 写入上
 logger.add(
     sys.stderr,
     format="<level>{level: <8}</level> | <cyan>{name}</cyan>:<cyan>{function}</cyan>:<cyan>{line}</cyan> - <level>{message}</level>",
     level="INFO",
     colorize=True,
+    enqueue=True,
 )
 
 # 导出 logger 实例供其他模块使用
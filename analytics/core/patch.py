@@ -3,10 +3,10 @@ API 请求伪装补丁
 用于绕过反爬虫限制
 """
 
+import http.cookiejar
 import random
 import requests
 from requests.adapters import HTTPAdapter
-from urllib3.util.retry import Retry
 
 # 常见浏览器 UA
 # 常见浏览器 UA (扩充列表)
@@ -73,12 +73,25 @@ def _patched_request(self, method, url, *args, **kwargs):
 
     kwargs["headers"] = headers
     
-    # 增加超时设置 (如果未设置)
+    # 增加超时设置 (如果未设置): 连接超时与读取超时分开，上游不可达时快速失败
     if "timeout" not in kwargs:
-        kwargs["timeout"] = 15
+        kwargs["timeout"] = (3.05, 15)
         
     return _original_request(self, method, url, *args, **kwargs)
 
+# 共享连接池（重试由 akshare_call_with_retry 负责，这里不再叠加）
+_pooled_session = requests.Session()
+_pooled_adapter = HTTPAdapter(pool_connections=32, pool_maxsize=32, max_retries=0)
+_pooled_session.mount("https://", _pooled_adapter)
+_pooled_session.mount("http://", _pooled_adapter)
+# 只共享连接池、不共享 Cookie: 拒绝保存任何 Cookie，与原先每次新建 Session 的行为一致，
+# 避免某个接口下发的 Cookie 被带到其他请求上
+_pooled_session.cookies.set_policy(http.cookiejar.DefaultCookiePolicy(allowed_domains=[]))
+
+def _pooled_request(method, url, **kwargs):
+    """requests.api.request 的替代实现，复用共享 Session"""
+    return _pooled_session.request(method=method, url=url, **kwargs)
+
 def apply_patches():
     """应用所有补丁"""
     print("🛡️ 正在应用 API 伪装补丁...")
@@ -87,19 +100,10 @@ def apply_patches():
     requests.Session.request = _patched_request
     print("✅ 已注入随机 User-Agent 和浏览器 Headers")
     
-    # 2. 配置全局重试策略 (针对 requests.get/post 等直接调用)
-    # 注意：AkShare 内部虽然可能有自己的 session，但这个全局补丁能覆盖大部分情况
-    retry_strategy = Retry(
-        total=3,
-        backoff_factor=1,
-        status_forcelist=[429, 500, 502, 503, 504],
-        allowed_methods=["HEAD", "GET", "OPTIONS", "POST"]
-    )
-    adapter = HTTPAdapter(max_retries=retry_strategy)
-    http = requests.Session()
-    http.mount("https://", adapter)
-    http.mount("http://", adapter)
-    
-    http.mount("http://", adapter)
-    
+    # 2. 让 requests.get/post 等模块级调用共用一个连接池
+    # requests.api.request 每次都会新建 Session，AkShare 大多走这条路径，
+    # 导致每次调用都重新 TCP + TLS 握手。改为复用同一个 keep-alive Session。
+    requests.api.request = _pooled_request
+    print("✅ 已启用共享 HTTP 连接池")
+
     print("🛡️ API 伪装补丁已生效")
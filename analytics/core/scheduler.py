@@ -5,6 +5,7 @@
 基于交易时间的智能缓存预热调度
 """
 
+from concurrent.futures import ThreadPoolExecutor
 from datetime import date
 from typing import Callable, List, Optional
 from apscheduler.schedulers.background import BackgroundScheduler
@@ -467,10 +468,13 @@ def initial_warmup():
         logger.info("✅ 核心指标预热完成")
         
         # 后台继续预热次要数据
-
-        warmup_cache(CNBonds.get_bond_market_analysis)
-        warmup_cache(LPRAnalysis.get_lpr_rates)
-        warmup_cache(USTreasury.get_us_bond_yields)
+        # 三者互不依赖且均为网络 I/O，并发执行 (请求频率仍由全局节流器控制)
+        with ThreadPoolExecutor(max_workers=3) as executor:
+            list(executor.map(warmup_cache, [
+                CNBonds.get_bond_market_analysis,
+                LPRAnalysis.get_lpr_rates,
+                USTreasury.get_us_bond_yields,
+            ]))
 
     except Exception as e:
         logger.error(f"❌ 初始预热过程中发生错误: {e}")
@@ -491,16 +495,18 @@ def snapshot_daily_metrics():
             
             # 1. 记录 CN 恐慌指数
             # 注意：这里我们重新计算一次，以确保是最新的
-            result = CNFearGreedIndex.calculate(symbol="sh000001", days=14)
+            # calculate 经 @cached 包装，返回 {"status": ..., "data": {...}}
+            response = CNFearGreedIndex.calculate(symbol="sh000001", days=14)
+            result = response.get("data") if isinstance(response, dict) else None
             if result and "score" in result:
-                await SentimentHistory.update_or_create(
-                    date=date.today(),
-                    market="CN",
-                    defaults={
-                        "score": result["score"],
-                        "level": result["level"]
-                    }
-                )
+                await SentimentHistory.upsert_many([
+                    SentimentHistory(
+                        date=date.today(),
+                        market="CN",
+                        score=result["score"],
+                        level=result["level"],
+                    )
+                ])
                 logger.info(f"✅ [DB] 已保存今日恐慌指数: {result['score']}")
             
         except Exception as e:
@@ -2,16 +2,39 @@
 工具函数模块
 """
 
+import math
+import threading
+import time
+import numpy as np
+import pandas as pd
 import pytz  # type: ignore[import-untyped]
 from datetime import datetime, time as dt_time
-from typing import Any, Dict, Tuple, cast, overload, Optional
+from functools import lru_cache
+from typing import Any, Dict, Iterable, Tuple, cast, overload, Optional
 from .config import settings
+from .logger import logger
+
+
+BEIJING_TZ = pytz.timezone("Asia/Shanghai")
 
 
 def get_beijing_time() -> datetime:
     """获取北京时间"""
-    beijing_tz = pytz.timezone("Asia/Shanghai")
-    return datetime.now(beijing_tz)
+    return datetime.now(BEIJING_TZ)
+
+
+@lru_cache(maxsize=2)
+def _format_beijing_time(epoch_s: int) -> str:
+    return datetime.fromtimestamp(epoch_s, BEIJING_TZ).strftime("%Y-%m-%d %H:%M:%S")
+
+
+def get_beijing_time_str() -> str:
+    """
+    获取北京时间字符串 (YYYY-MM-DD HH:MM:SS)
+
+    同一秒内结果相同，按秒缓存格式化结果，避免每个响应都调用 strftime
+    """
+    return _format_beijing_time(int(time.time()))
 
 
 def is_trading_hours(market: str) -> bool:
@@ -94,11 +117,47 @@ def safe_float(value: Any, default: float = 0.0) -> float: ...
 def safe_float(value: Any, default: None) -> Optional[float]: ...
 
 def safe_float(value: Any, default: Optional[float] = 0.0) -> Optional[float]:
-    """安全转换为浮点数，支持 None 默认值"""
+    """安全转换为浮点数，支持 None 默认值 (NaN 视为缺失)"""
+    # 快速路径: 数值化后的列取出的大多已是 float (含 np.float64)，NaN 自身不相等
+    if type(value) is float or type(value) is np.float64:
+        return float(value) if value == value else default
     try:
-        return float(value) if value is not None else default
+        result = float(value) if value is not None else default
     except (ValueError, TypeError):
         return default
+    if result is not None and math.isnan(result):
+        return default
+    return result
+
+
+def downcast_frame(
+    df: pd.DataFrame,
+    numeric_cols: Iterable[str] = (),
+    category_cols: Iterable[str] = (),
+) -> pd.DataFrame:
+    """
+    在数据入口处统一列类型
+
+    AkShare 返回的数值列常为 object (字符串/Decimal)，后续每次比较、排序
+    都要逐个拆箱。这里一次性转为数值列，重复度高的字符串列转为 category。
+    数值保持 float64：这些值会原样返回给前端，float32 会引入
+    1.2300000190734863 这类精度噪声。
+
+    Args:
+        df: 原始 DataFrame (原地修改并返回)
+        numeric_cols: 需转为数值的列，无法解析的值变为 NaN
+        category_cols: 需转为 category 的列
+
+    Returns:
+        pd.DataFrame: 转换后的 DataFrame
+    """
+    for col in numeric_cols:
+        if col in df.columns:
+            df[col] = pd.to_numeric(df[col], errors="coerce")
+    for col in category_cols:
+        if col in df.columns:
+            df[col] = df[col].astype("category")
+    return df
 
 
 def generate_cache_key(*args) -> str:
@@ -107,6 +166,58 @@ def generate_cache_key(*args) -> str:
     return ":".join(key_parts)
 
 
+# 熔断: 同一上游 (AkShare 函数 + symbol) 连续 CIRCUIT_FAIL_MAX 次调用 (重试耗尽) 都因连接类错误失败后，
+# CIRCUIT_RESET_SECONDS 秒内直接失败，不再请求上游；
+# 到期后进入半开状态: 只放行一个调用方做一次试探请求 (不重试)，其余调用方仍直接失败，
+# 试探成功则恢复，失败则重新计时
+CIRCUIT_FAIL_MAX = 3
+CIRCUIT_RESET_SECONDS = 30
+
+# 熔断键 -> (连续失败次数, 最近一次失败时间, 是否有试探请求进行中)
+_circuit_state: Dict[str, Tuple[int, float, bool]] = {}
+_circuit_lock = threading.Lock()
+
+
+class CircuitOpenError(Exception):
+    """上游处于熔断状态，本次调用未发出请求"""
+
+
+def _circuit_key(func_name: str, args: tuple, kwargs: Dict[str, Any]) -> str:
+    """熔断键: 函数名 + symbol，避免单个代码异常波及同一接口的其他代码"""
+    symbol = kwargs.get("symbol", args[0] if args else None)
+    return f"{func_name}:{symbol}" if symbol is not None else func_name
+
+
+def _circuit_acquire(key: str) -> bool:
+    """
+    调用前检查熔断状态
+
+    Returns:
+        bool: True 表示本次调用是半开状态下的试探请求
+
+    Raises:
+        CircuitOpenError: 熔断中，或已有其他调用方在试探
+    """
+    with _circuit_lock:
+        failures, last_failure, probing = _circuit_state.get(key, (0, 0.0, False))
+        if failures < CIRCUIT_FAIL_MAX:
+            return False
+        if probing or time.time() - last_failure < CIRCUIT_RESET_SECONDS:
+            raise CircuitOpenError(f"{key} 连续失败，熔断中 ({CIRCUIT_RESET_SECONDS}秒后重试)")
+        _circuit_state[key] = (failures, last_failure, True)
+        return True
+
+
+def _circuit_record(key: str, success: bool) -> None:
+    """记录调用结果: 成功则关闭熔断，失败则累计次数并结束试探状态"""
+    with _circuit_lock:
+        if success:
+            _circuit_state.pop(key, None)
+        else:
+            failures, _, _ = _circuit_state.get(key, (0, 0.0, False))
+            _circuit_state[key] = (failures + 1, time.time(), False)
+
+
 def akshare_call_with_retry(
     func,
     *args,
@@ -130,12 +241,18 @@ def akshare_call_with_retry(
         API 调用结果
 
     Raises:
+        CircuitOpenError: 该函数处于熔断状态
         Exception: 所有重试失败后抛出最后一个异常
     """
-    import time
     import random
     from .throttler import throttler
 
+    func_name = getattr(func, '__name__', str(func))
+    circuit_key = _circuit_key(func_name, args, kwargs)
+    if _circuit_acquire(circuit_key):
+        # 半开试探只请求一次，尽快得出上游是否恢复
+        max_retries = 1
+
     last_exception = None
 
     for attempt in range(max_retries):
@@ -144,7 +261,9 @@ def akshare_call_with_retry(
             if use_throttle:
                 throttler.wait_if_needed()
 
-            return func(*args, **kwargs)
+            result = func(*args, **kwargs)
+            _circuit_record(circuit_key, success=True)
+            return result
         except Exception as e:
             last_exception = e
             error_msg = str(e).lower()
@@ -171,22 +290,22 @@ def akshare_call_with_retry(
             )
 
             if not is_connection_error:
-                # 非连接错误，直接抛出
+                # 非连接错误，直接抛出 (上游可达，不计入熔断)
+                _circuit_record(circuit_key, success=True)
                 raise
 
             if attempt < max_retries - 1:
                 # 指数退避 + 随机抖动，避免同时重试造成更大压力
                 jitter = random.uniform(0.5, 1.5)
                 delay = base_delay * (2 ** attempt) * jitter
-                func_name = getattr(func, '__name__', str(func))
-                print(
-                    f"⚠️ API调用失败 [{func_name}] (尝试 {attempt + 1}/{max_retries}): {str(e)[:100]}"
+                logger.warning(
+                    f"⚠️ API调用失败 [{func_name}] (尝试 {attempt + 1}/{max_retries}): {str(e)[:100]}，"
+                    f"{delay:.1f}秒后重试..."
                 )
-                print(f"   {delay:.1f}秒后重试...")
                 time.sleep(delay)
             else:
-                func_name = getattr(func, '__name__', str(func))
-                print(f"❌ API调用失败 [{func_name}] (已重试{max_retries}次): {str(e)[:150]}")
+                logger.error(f"❌ API调用失败 [{func_name}] (已重试{max_retries}次): {str(e)[:150]}")
+                _circuit_record(circuit_key, success=False)
 
     raise last_exception  # type: ignore
 
@@ -1,3 +1,4 @@
+from typing import Iterable
 from tortoise import fields, models
 
 class SentimentHistory(models.Model):
@@ -15,6 +16,24 @@ class SentimentHistory(models.Model):
     class Meta:
         table = "sentiment_history"
         unique_together = ("date", "market")
+        # "latest N scores for a market" filters on market and orders by date;
+        # a B-tree on (market, date) serves both directions of the sort
+        indexes = (("market", "date"),)
+
+    @classmethod
+    async def upsert_many(cls, records: Iterable["SentimentHistory"], batch_size: int = 500) -> None:
+        """
+        Insert or update rows keyed by (date, market) in bulk.
+
+        Collapses per-row update_or_create round trips into
+        INSERT ... ON CONFLICT (date, market) DO UPDATE batches.
+        """
+        await cls.bulk_create(
+            list(records),
+            batch_size=batch_size,
+            update_fields=["score", "level"],
+            on_conflict=["date", "market"],
+        )
 
     def __str__(self):
         return f"{self.date} [{self.market}]: {self.score} ({self.level})"
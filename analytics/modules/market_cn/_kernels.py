@@ -0,0 +1,69 @@
+"""
+数值计算内核
+numba 可用时 JIT 编译为机器码，未安装时退化为普通 Python 函数 (结果一致)
+
+内核均声明了显式签名: numba 在模块导入时即完成编译 (而非首次调用时)，
+配合 cache=True 将编译结果持久化到磁盘，进程重启后无需重新生成代码。
+以上仅在安装了 numba 时生效 (见 analytics.core.kernels)。
+"""
+
+import numpy as np
+
+from ...core.kernels import njit, rsi_wilder
+
+
+@njit("UniTuple(float64, 4)(float64[:], float64[:], float64[:], float64[:], int64)", cache=True)
+def fear_greed_core(
+    close: np.ndarray, high: np.ndarray, low: np.ndarray, rsi_close: np.ndarray, period: int
+):
+    """
+    恐慌贪婪指数的数值部分 (价格动量 / 年化波动率 / RSI / 高低位置)
+
+    rsi_close 为计算 RSI 用的收盘价，需比统计窗口多出 period 天的历史，
+    否则 Wilder 平滑的初值不足 period 个差值。
+
+    Returns:
+        (price_change, volatility, rsi, high_low_ratio)，无法计算的项为 NaN
+        (高低价全部缺失时 high_low_ratio 为 NaN)
+    """
+    n = close.shape[0]
+    last = close[n - 1]
+
+    # 1. 区间涨跌幅 (%)
+    price_change = (last - close[0]) / close[0] * 100.0
+
+    # 单次遍历: Welford 累积日收益率的均值/平方和，同时维护区间最低/最高价，
+    # 不分配任何临时数组
+    mean = 0.0
+    m2 = 0.0
+    lo = np.inf
+    hi = -np.inf
+    for i in range(n):
+        if low[i] < lo:
+            lo = low[i]
+        if high[i] > hi:
+            hi = high[i]
+        if i > 0:
+            r = (close[i] - close[i - 1]) / close[i - 1]
+            delta = r - mean
+            mean += delta / i
+            m2 += delta * (r - mean)
+
+    # 2. 日收益率的样本标准差 (ddof=1)，年化后以 % 表示
+    if n > 2:
+        volatility = np.sqrt(m2 / (n - 2)) * np.sqrt(252.0) * 100.0
+    else:
+        volatility = np.nan
+
+    # 3. RSI
+    rsi = rsi_wilder(rsi_close, period)
+
+    # 4. 收盘价在区间高低点中的相对位置；区间无波动时视为居中
+    if hi > lo:
+        high_low_ratio = (last - lo) / (hi - lo)
+    elif hi == lo:
+        high_low_ratio = 0.5
+    else:
+        high_low_ratio = np.nan
+
+    return price_change, volatility, rsi, high_low_ratio
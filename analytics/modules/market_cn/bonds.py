@@ -4,13 +4,50 @@
 """
 
 import akshare as ak
+import numpy as np
 import pandas as pd
-from typing import Dict, Any, List
+from bisect import bisect_left
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, List, Optional, Tuple
 from ...core.cache import cached
 from ...core.config import settings
-from ...core.utils import safe_float, get_beijing_time, akshare_call_with_retry
+from ...core.data_provider import data_provider
+from ...core.utils import get_beijing_time, get_beijing_time_str, akshare_call_with_retry
 from ...core.logger import logger
 
+# 分档查找表: 阈值升序排列，bisect_left 得到档位 (与 "> 阈值" 的判断等价)
+# 曲线形态 (按 10Y-2Y 利差)
+_SHAPE_THRESHOLDS = (-0.2, 0.2, 1.0)
+_SHAPE_TABLE = (
+    ("倒挂", "收益率曲线出现倒挂，可能预示经济衰退风险"),
+    ("平坦", "收益率曲线趋于平坦，市场对未来经济增长预期谨慎"),
+    ("正常", "收益率曲线形态正常"),
+    ("陡峭", "收益率曲线较为陡峭，反映经济增长预期较强"),
+)
+
+# 利率水平 (按 10Y 收益率)
+_RATE_LEVEL_THRESHOLDS = (2.5, 3.5)
+_RATE_LEVEL_TABLE = (
+    ("低位", "收益率处于相对低位，债券配置价值有限"),
+    ("中位", "收益率处于中等水平"),
+    ("高位", "收益率处于相对高位，债券配置价值较高"),
+)
+
+# 期限利差状态 (按 10Y-2Y 利差)
+_SPREAD_THRESHOLDS = (0.2, 0.8)
+_SPREAD_TABLE = (
+    ("倒挂", "收益率曲线倒挂，可能预示经济衰退风险"),
+    ("平坦", "收益率曲线趋于平坦，需关注经济预期变化"),
+    ("正常", "收益率曲线形态正常，长短端利差合理"),
+)
+
+# 收益率历史走势使用的列 -> 输出字段
+_HISTORY_COLUMNS = {
+    "中国国债收益率10年": "10y",
+    "中国国债收益率2年": "2y",
+    "中国国债收益率1年": "1y",
+}
+
 
 class CNBonds:
     """中国国债分析"""
@@ -21,52 +58,27 @@ class CNBonds:
         """
         获取国债收益率数据 (混合数据源)
         """
+        # 时间戳只取一次，日期窗口与各返回路径共用
+        now = get_beijing_time()
+        now_str = now.strftime("%Y-%m-%d %H:%M:%S")
         try:
-            logger.info("📊 获取国债收益率数据(主源)...")
-            
-            # 1. 主数据源: 中债国债收益率曲线 (覆盖大部分期限)
             # 动态计算日期范围 (取最近3个月)
-            end_date = get_beijing_time()
+            end_date = now
             start_date = end_date - pd.Timedelta(days=90)
             
             start_str = start_date.strftime("%Y%m%d")
             end_str = end_date.strftime("%Y%m%d")
 
-            df_primary = pd.DataFrame()
-            try:
-                df_primary = akshare_call_with_retry(ak.bond_china_yield, start_date=start_str, end_date=end_str)
-                # 过滤只保留国债
-                if not df_primary.empty and "曲线名称" in df_primary.columns:
-                    df_primary = df_primary[df_primary["曲线名称"] == "中债国债收益率曲线"]
-                    # 排序
-                    if "日期" in df_primary.columns:
-                        df_primary["日期"] = pd.to_datetime(df_primary["日期"])
-                        df_primary = df_primary.sort_values("日期")
-            except Exception as e:
-                logger.warning(f" 主数据源获取失败: {e}")
-
-            # 2. 补充数据源: Investing (用于补充 2年期 等缺失数据)
-            logger.info("📊 获取国债收益率数据(补充源)...")
-            df_sec = pd.DataFrame()
-            try:
-                # 该接口虽然经常被封, 但包含关键的 2Y 数据
-                # 这里不抛出异常，失败了就只用主源
-                df_sec = akshare_call_with_retry(ak.bond_zh_us_rate, max_retries=2)
-            except Exception as e:
-                logger.warning(f" 补充数据源获取失败: {e}")
+            # 主源与补充源互不依赖，并发请求 (耗时取两者最大值而非之和)
+            with ThreadPoolExecutor(max_workers=2) as executor:
+                f_primary = executor.submit(CNBonds._fetch_primary_curve, start_str, end_str)
+                f_sec = executor.submit(CNBonds._fetch_secondary_curve)
+                df_primary = f_primary.result()
+                df_sec = f_sec.result()
 
             if df_primary.empty and df_sec.empty:
                 raise ValueError("所有国债数据源均不可用")
 
-            # 准备数据提取
-            # 主源最新数据
-            latest_pri = df_primary.iloc[-1] if not df_primary.empty else {}
-            prev_pri = df_primary.iloc[-2] if len(df_primary) > 1 else latest_pri
-            
-            # 补充源最新数据
-            latest_sec = df_sec.iloc[-1] if not df_sec.empty else {}
-            prev_sec = df_sec.iloc[-2] if len(df_sec) > 1 else latest_sec
-
             # 映射表: key -> (主源列名, 补充源列名)
             curve_mapping = {
                 "1m": ("1月", None),        # 1M 主源无，补充源无?
@@ -80,40 +92,24 @@ class CNBonds:
                 "10y": ("10年", "中国国债收益率10年"),
                 "30y": ("30年", "中国国债收益率30年")
             }
+            keys = list(curve_mapping)
 
-            yield_curve = {}
-            yield_changes = {}
+            # 两个数据源的最新值/前值，各取一次整行向量 (缺失为 NaN)
+            pri_latest, pri_prev = CNBonds._last_two_rows(df_primary, [c[0] for c in curve_mapping.values()])
+            sec_latest, sec_prev = CNBonds._last_two_rows(df_sec, [c[1] for c in curve_mapping.values()])
 
-            for key, (col_pri, col_sec) in curve_mapping.items():
-                current_val = None
-                prev_val = None
-                
-                # 优先尝试主源
-                if col_pri and not df_primary.empty:
-                    val = latest_pri.get(col_pri)
-                    if pd.notna(val):
-                        current_val = safe_float(val, default=None)
-                        # 前值
-                        p_val = prev_pri.get(col_pri)
-                        prev_val = safe_float(p_val, default=None)
-
-                # 如果主源没有(或无效)，尝试补充源
-                if current_val is None and col_sec and not df_sec.empty:
-                    val = latest_sec.get(col_sec)
-                    if pd.notna(val):
-                        current_val = safe_float(val, default=None)
-                        # 前值
-                        p_val = prev_sec.get(col_sec)
-                        prev_val = safe_float(p_val, default=None)
-                
-                # 依然没有? 那就是真没有了 (如 1m)
-                yield_curve[key] = current_val
-                
-                # 计算涨跌 (如果都有值)
-                if current_val is not None and prev_val is not None:
-                    yield_changes[key] = round((current_val - prev_val) * 100, 2) # BP
-                else:
-                    yield_changes[key] = 0 # 或 None, 前端处理 0 也可以(无变化)
+            # 优先主源，主源无效时整对 (最新值, 前值) 取补充源
+            use_pri = ~np.isnan(pri_latest)
+            current = np.where(use_pri, pri_latest, sec_latest)
+            prev = np.where(use_pri, pri_prev, sec_prev)
+
+            # 计算涨跌 (BP)，任一缺失则记为 0 (前端按无变化处理)
+            changes = np.round((current - prev) * 100, 2)
+            changes = np.where(np.isnan(changes), 0, changes)
+
+            # 依然没有? 那就是真没有了 (如 1m)
+            yield_curve = {k: (None if np.isnan(v) else v) for k, v in zip(keys, current.tolist())}
+            yield_changes = dict(zip(keys, changes.tolist()))
 
             logger.info(" 国债数据整合完成")
 
@@ -121,7 +117,12 @@ class CNBonds:
             curve_analysis = CNBonds._analyze_yield_curve(yield_curve)
 
             # 获取历史走势（最近30天）
-            history_data = CNBonds._get_yield_history(df_primary)
+            # 这些列来自补充源 (主源为 "10年" 等列名)，两源都没有时直接跳过，不输出全 0 的走势
+            history_src = next(
+                (d for d in (df_primary, df_sec) if not d.empty and not _HISTORY_COLUMNS.keys().isdisjoint(d.columns)),
+                None,
+            )
+            history_data = CNBonds._get_yield_history(history_src) if history_src is not None else []
 
             # 安全计算利差（处理 None 值）
             ten_y = yield_curve.get("10y")
@@ -142,7 +143,7 @@ class CNBonds:
                     "2y": two_y,
                     "spread_10y_2y": spread_10y_2y,
                 },
-                "update_time": get_beijing_time().strftime("%Y-%m-%d %H:%M:%S"),
+                "update_time": now_str,
             }
 
         except Exception as e:
@@ -150,7 +151,7 @@ class CNBonds:
             return {
                 "error": str(e),
                 "yield_curve": {},
-                "update_time": get_beijing_time().strftime("%Y-%m-%d %H:%M:%S"),
+                "update_time": now_str,
             }
 
     @staticmethod
@@ -162,6 +163,7 @@ class CNBonds:
         Returns:
             债券市场分析数据
         """
+        now_str = get_beijing_time_str()
         try:
             # 获取国债收益率数据
             yield_data = CNBonds.get_treasury_yields()
@@ -196,20 +198,15 @@ class CNBonds:
             analysis = actual_data.copy()
 
             # 1. 利率水平分析
-            # 使用 .get() 增加健壮性，防止 'key_rates' 不存在导致的 KeyError
-            key_rates = yield_data.get("key_rates", {})
+            # 注意读取解包后的 actual_data，而非带 status 外壳的响应
+            key_rates = CNBonds._get_key_rates(actual_data)
             ten_year_yield = key_rates.get("10y")
             
-            # 如果关键数据缺失，给予默认值或处理
-            if ten_year_yield is not None and ten_year_yield > 3.5:
-                rate_level = "高位"
-                rate_comment = "收益率处于相对高位，债券配置价值较高"
-            elif ten_year_yield is not None and ten_year_yield > 2.5:
-                rate_level = "中位"
-                rate_comment = "收益率处于中等水平"
+            # 如果关键数据缺失，按低位处理
+            if ten_year_yield is not None:
+                rate_level, rate_comment = _RATE_LEVEL_TABLE[bisect_left(_RATE_LEVEL_THRESHOLDS, ten_year_yield)]
             else:
-                rate_level = "低位"
-                rate_comment = "收益率处于相对低位，债券配置价值有限"
+                rate_level, rate_comment = _RATE_LEVEL_TABLE[0]
 
             analysis["rate_level"] = {
                 "level": rate_level,
@@ -219,15 +216,8 @@ class CNBonds:
 
             # 2. 期限利差分析
             spread_10y_2y = key_rates.get("spread_10y_2y")
-            if spread_10y_2y is not None and spread_10y_2y > 0.8:
-                spread_status = "正常"
-                spread_comment = "收益率曲线形态正常，长短端利差合理"
-            elif spread_10y_2y is not None and spread_10y_2y > 0.2:
-                spread_status = "平坦"
-                spread_comment = "收益率曲线趋于平坦，需关注经济预期变化"
-            elif spread_10y_2y is not None:
-                spread_status = "倒挂"
-                spread_comment = "收益率曲线倒挂，可能预示经济衰退风险"
+            if spread_10y_2y is not None:
+                spread_status, spread_comment = _SPREAD_TABLE[bisect_left(_SPREAD_THRESHOLDS, spread_10y_2y)]
             else:
                 spread_status = "未知"
                 spread_comment = "数据缺失，无法分析期限利差"
@@ -238,7 +228,7 @@ class CNBonds:
                 "spread_10y_2y": spread_10y_2y,
             }
 
-            analysis["update_time"] = get_beijing_time().strftime("%Y-%m-%d %H:%M:%S")
+            analysis["update_time"] = now_str
 
             return analysis
 
@@ -246,9 +236,59 @@ class CNBonds:
             logger.error(f" 债券市场分析失败: {e}")
             return {
                 "error": str(e),
-                "update_time": get_beijing_time().strftime("%Y-%m-%d %H:%M:%S"),
+                "update_time": now_str,
             }
 
+    @staticmethod
+    def _get_key_rates(yield_data: Dict[str, Any]) -> Dict[str, Any]:
+        """从国债收益率数据中只取出关键利率 (10Y / 2Y / 10Y-2Y 利差)"""
+        key_rates = yield_data.get("key_rates") or {}
+        return {
+            "10y": key_rates.get("10y"),
+            "2y": key_rates.get("2y"),
+            "spread_10y_2y": key_rates.get("spread_10y_2y"),
+        }
+
+    @staticmethod
+    def _fetch_primary_curve(start_str: str, end_str: str) -> pd.DataFrame:
+        """
+        主数据源: 中债国债收益率曲线 (覆盖大部分期限)，失败返回空表
+
+        增量拉取与缓存由共享数据层负责，这里只处理失败降级。
+        """
+        logger.info("📊 获取国债收益率数据(主源)...")
+        try:
+            return data_provider.get_bond_china_yield(start_str, end_str)
+        except Exception as e:
+            logger.warning(f" 主数据源获取失败: {e}")
+            return pd.DataFrame()
+
+    @staticmethod
+    def _fetch_secondary_curve() -> pd.DataFrame:
+        """补充数据源: Investing (用于补充 2年期 等缺失数据)，失败返回空表"""
+        logger.info("📊 获取国债收益率数据(补充源)...")
+        try:
+            # 该接口虽然经常被封, 但包含关键的 2Y 数据
+            # 这里不抛出异常，失败了就只用主源
+            return akshare_call_with_retry(ak.bond_zh_us_rate, max_retries=2)
+        except Exception as e:
+            logger.warning(f" 补充数据源获取失败: {e}")
+            return pd.DataFrame()
+
+    @staticmethod
+    def _last_two_rows(df: pd.DataFrame, cols: List[Optional[str]]) -> Tuple[np.ndarray, np.ndarray]:
+        """取最后两行在指定列上的数值 (最新值, 前值)，缺失列/无效值为 NaN"""
+        if df.empty:
+            empty = np.full(len(cols), np.nan)
+            return empty, empty
+        values = (
+            df.tail(2)
+            .reindex(columns=cols)
+            .apply(pd.to_numeric, errors="coerce")
+            .to_numpy(dtype=float)
+        )
+        return values[-1], values[0]
+
     @staticmethod
     def _period_to_chinese(period: str) -> str:
         """期限转换为中文"""
@@ -289,18 +329,7 @@ class CNBonds:
             spread_10y_3m = ten_y - three_m if three_m is not None else None
 
             # 判断曲线形态
-            if spread_10y_2y > 1.0:
-                curve_shape = "陡峭"
-                shape_comment = "收益率曲线较为陡峭，反映经济增长预期较强"
-            elif spread_10y_2y > 0.2:
-                curve_shape = "正常"
-                shape_comment = "收益率曲线形态正常"
-            elif spread_10y_2y > -0.2:
-                curve_shape = "平坦"
-                shape_comment = "收益率曲线趋于平坦，市场对未来经济增长预期谨慎"
-            else:
-                curve_shape = "倒挂"
-                shape_comment = "收益率曲线出现倒挂，可能预示经济衰退风险"
+            curve_shape, shape_comment = _SHAPE_TABLE[bisect_left(_SHAPE_THRESHOLDS, spread_10y_2y)]
 
             return {
                 "shape": curve_shape,
@@ -317,22 +346,31 @@ class CNBonds:
     def _get_yield_history(df: pd.DataFrame, days: int = 30) -> List[Dict[str, Any]]:
         """获取收益率历史数据"""
         try:
-            # 取最近30天的数据
-            recent_df = df.tail(days)
-
-            history = []
-            for _, row in recent_df.iterrows():
-                date_val = row.get("日期", row.name)
-                date_str = date_val.strftime("%Y-%m-%d") if hasattr(date_val, "strftime") else str(date_val)
-                
-                history.append(
-                    {
-                        "date": date_str,
-                        "10y": safe_float(row.get("中国国债收益率10年", 0)),
-                        "2y": safe_float(row.get("中国国债收益率2年", 0)),
-                        "1y": safe_float(row.get("中国国债收益率1年", 0)),
-                    }
-                )
+            present = [c for c in _HISTORY_COLUMNS if c in df.columns]
+            if df.empty or not present:
+                return []
+
+            # 取最近30天的数据 (跳过这几列全为空的行，如补充源中仅有美债数据的日期)
+            recent_df = df.dropna(subset=present, how="all").tail(days)
+
+            # 日期列优先，缺失时退回索引
+            if "日期" in recent_df.columns:
+                dates = pd.to_datetime(recent_df["日期"]).dt.strftime("%Y-%m-%d").tolist()
+            elif isinstance(recent_df.index, pd.DatetimeIndex):
+                dates = recent_df.index.strftime("%Y-%m-%d").tolist()
+            else:
+                dates = recent_df.index.astype(str).tolist()
+
+            # 整列转换为数值，无效值按 0 处理；数据源没有的期限输出 None
+            columns = [
+                pd.to_numeric(recent_df[col], errors="coerce").fillna(0.0).tolist()
+                if col in recent_df.columns
+                else [None] * len(recent_df)
+                for col in _HISTORY_COLUMNS
+            ]
+            keys = ["date", *_HISTORY_COLUMNS.values()]
+
+            history = [dict(zip(keys, row)) for row in zip(dates, *columns)]
 
             return history
 
@@ -6,12 +6,41 @@
 import akshare as ak
 import pandas as pd
 import numpy as np
+from bisect import bisect_right
 
 from typing import Dict, Any, Optional
 from ...core.cache import cached
 from ...core.config import settings
-from ...core.utils import safe_float, get_beijing_time, akshare_call_with_retry
+from ...core.utils import safe_float, get_beijing_time_str, akshare_call_with_retry
 from ...core.logger import logger
+from ._kernels import fear_greed_core
+
+# RSI 周期: 计算 RSI 时在统计窗口之外再多取这么多天的收盘价
+_RSI_PERIOD = 14
+
+# 等级查找表: 分数 >= 阈值即进入对应档位，bisect_right 得到档位下标
+_LEVEL_THRESHOLDS = (20, 35, 45, 55, 65, 80)
+_LEVEL_TABLE = (
+    ("极度恐慌", "市场情绪极度悲观，可能是抄底时机"),
+    ("恐慌", "市场情绪偏向悲观，可能存在机会"),
+    ("轻微恐慌", "市场情绪略显悲观"),
+    ("中性", "市场情绪相对平衡"),
+    ("轻微贪婪", "市场情绪略显乐观"),
+    ("贪婪", "市场情绪偏向乐观，注意风险控制"),
+    ("极度贪婪", "市场情绪极度乐观，可能存在泡沫风险"),
+)
+
+# 指数说明 (静态文本，模块加载时生成一次)
+_EXPLANATION = """
+恐慌贪婪指数说明：
+• 指数范围：0-100，数值越高表示市场越贪婪
+• 计算因子：价格动量(25%)、波动率(20%)、RSI(20%)、市场广度(20%)、成交量(15%)
+• 极度恐慌(0-20)：可能是买入时机
+• 恐慌(20-35)：市场悲观，谨慎观望
+• 中性(35-65)：市场情绪平衡
+• 贪婪(65-80)：市场乐观，注意风险
+• 极度贪婪(80-100)：可能存在泡沫，考虑减仓
+""".strip()
 
 
 class CNFearGreedIndex:
@@ -45,20 +74,29 @@ class CNFearGreedIndex:
             if missing_columns:
                 raise ValueError(f"数据缺少必要列: {missing_columns}")
 
-            # 取最近的数据
-            recent_data = index_data.tail(days)
-            if len(recent_data) < days:
-                raise ValueError(f"数据不足，需要{days}天，实际{len(recent_data)}天")
+            # 取最近的数据: 直接切出末尾 days 行的 float64 数组，不构造新的 DataFrame
+            if len(index_data) < days:
+                raise ValueError(f"数据不足，需要{days}天，实际{len(index_data)}天")
+
+            close, high, low = (
+                CNFearGreedIndex._tail_array(index_data, col, days) for col in ("close", "high", "low")
+            )
+            rsi_close = CNFearGreedIndex._tail_array(index_data, "close", days + _RSI_PERIOD)
+            volume = (
+                CNFearGreedIndex._tail_array(index_data, "volume", days)
+                if "volume" in index_data.columns
+                else None
+            )
 
             # 计算各项指标
-            indicators = CNFearGreedIndex._calculate_indicators(recent_data, symbol)
+            indicators = CNFearGreedIndex._calculate_indicators(close, high, low, rsi_close, volume, symbol)
             
             # 如果指标计算失败，返回错误
             if "error" in indicators:
                 return {
                     "error": indicators["error"],
                     "message": "无法计算指标数据",
-                    "update_time": get_beijing_time().strftime("%Y-%m-%d %H:%M:%S"),
+                    "update_time": get_beijing_time_str(),
                 }
 
             # 计算综合指数 (0-100)
@@ -70,7 +108,7 @@ class CNFearGreedIndex:
                     "error": "无法计算综合得分",
                     "message": "指标数据不足",
                     "indicators": indicators,
-                    "update_time": get_beijing_time().strftime("%Y-%m-%d %H:%M:%S"),
+                    "update_time": get_beijing_time_str(),
                 }
 
             # 确定等级
@@ -85,8 +123,7 @@ class CNFearGreedIndex:
                 "indicators": indicators,
                 "symbol": symbol,
                 "days": days,
-                "update_time": get_beijing_time().strftime("%Y-%m-%d %H:%M:%S"),
-                "explanation": CNFearGreedIndex._get_explanation(),
+                "update_time": get_beijing_time_str(),
             }
 
         except Exception as e:
@@ -94,21 +131,31 @@ class CNFearGreedIndex:
             return {
                 "error": str(e),
                 "message": "无法计算恐慌贪婪指数",
-                "update_time": get_beijing_time().strftime("%Y-%m-%d %H:%M:%S"),
+                "update_time": get_beijing_time_str(),
             }
 
     @staticmethod
-    def _calculate_indicators(data: pd.DataFrame, symbol: str) -> Dict[str, Any]:
+    def _tail_array(df: pd.DataFrame, col: str, days: int) -> np.ndarray:
+        """取某列末尾 days 个值的 float64 数组，无法解析的值为 NaN"""
+        return pd.to_numeric(df[col].iloc[-days:], errors="coerce").to_numpy(dtype=np.float64)
+
+    @staticmethod
+    def _calculate_indicators(
+        close: np.ndarray,
+        high: np.ndarray,
+        low: np.ndarray,
+        rsi_close: np.ndarray,
+        volume: Optional[np.ndarray],
+        symbol: str,
+    ) -> Dict[str, Any]:
         """计算各项技术指标"""
         indicators = {}
 
         try:
+            # 数值部分一次性在内核中完成 (价格动量 / 波动率 / RSI / 高低位置)
+            price_change, volatility, rsi, high_low_ratio = fear_greed_core(close, high, low, rsi_close, _RSI_PERIOD)
+
             # 1. 价格动量 (Price Momentum) - 权重20% (原25%)
-            price_change = (
-                (data["close"].iloc[-1] - data["close"].iloc[0])
-                / data["close"].iloc[0]
-                * 100
-            )
             momentum_score = min(100, max(0, 50 + price_change * 2))  # 转换为0-100
             indicators["price_momentum"] = {
                 "value": round(price_change, 2),
@@ -117,8 +164,6 @@ class CNFearGreedIndex:
             }
 
             # 2. 波动率 (Volatility) - 权重15% (原20%)
-            returns = data["close"].pct_change().dropna()
-            volatility = returns.std() * np.sqrt(252) * 100  # 年化波动率
             # 波动率越高，恐慌程度越高，分数越低
             volatility_score = max(0, min(100, 100 - volatility * 2))
             indicators["volatility"] = {
@@ -128,9 +173,9 @@ class CNFearGreedIndex:
             }
 
             # 3. 成交量 (Volume) - 权重10% (原15%)
-            if "volume" in data.columns:
-                avg_volume = data["volume"].tail(5).mean()
-                prev_avg_volume = data["volume"].head(5).mean()
+            if volume is not None:
+                avg_volume = np.nanmean(volume[-5:])
+                prev_avg_volume = np.nanmean(volume[:5])
                 volume_change = (
                     (avg_volume - prev_avg_volume) / prev_avg_volume * 100
                     if prev_avg_volume > 0
@@ -147,26 +192,26 @@ class CNFearGreedIndex:
                 logger.warning("⚠️ 成交量数据不可用，跳过 volume 指标")
 
             # 4. RSI指标 - 权重20% (不变)
-            rsi = CNFearGreedIndex._calculate_rsi(data["close"])
-            # RSI > 70 贪婪，RSI < 30 恐慌
-            if rsi > 70:
-                rsi_score = 70 + (rsi - 70) * 1.5  # 贪婪区间
-            elif rsi < 30:
-                rsi_score = rsi * 1.67  # 恐慌区间
+            if not np.isnan(rsi):
+                # RSI > 70 贪婪，RSI < 30 恐慌
+                if rsi > 70:
+                    rsi_score = 70 + (rsi - 70) * 1.5  # 贪婪区间
+                elif rsi < 30:
+                    rsi_score = rsi * 1.67  # 恐慌区间
+                else:
+                    rsi_score = 30 + (rsi - 30) * 1  # 中性区间
+                rsi_score = min(100, max(0, rsi_score))
+                indicators["rsi"] = {
+                    "value": round(rsi, 2),
+                    "score": round(rsi_score, 1),
+                    "weight": 0.20,
+                }
             else:
-                rsi_score = 30 + (rsi - 30) * 1  # 中性区间
-            rsi_score = min(100, max(0, rsi_score))
-            indicators["rsi"] = {
-                "value": round(rsi, 2),
-                "score": round(rsi_score, 1),
-                "weight": 0.20,
-            }
+                # RSI 无法计算，跳过该指标（不填充假数据）
+                logger.warning("⚠️ RSI 无法计算，跳过 rsi 指标")
 
             # 5. 市场广度 (Market Breadth) - 权重15% (原20%)
             # 这里简化处理，使用价格相对位置
-            high_low_ratio = (data["close"].iloc[-1] - data["low"].min()) / (
-                data["high"].max() - data["low"].min()
-            )
             breadth_score = high_low_ratio * 100
             indicators["market_breadth"] = {
                 "value": round(high_low_ratio, 3),
@@ -176,7 +221,7 @@ class CNFearGreedIndex:
 
             # 6. 当日涨跌 (Daily Change) - 权重20% (新增)
             # 增强对当日市场表现的敏感度
-            daily_chg_pct = (data["close"].iloc[-1] - data["close"].iloc[-2]) / data["close"].iloc[-2] * 100
+            daily_chg_pct = (close[-1] - close[-2]) / close[-2] * 100
             daily_score = 50 + (daily_chg_pct * 10) # 1%涨幅 = +10分
             daily_score = min(100, max(0, daily_score))
             indicators["daily_change"] = {
@@ -192,19 +237,6 @@ class CNFearGreedIndex:
 
         return indicators
 
-    @staticmethod
-    def _calculate_rsi(prices: pd.Series, period: int = 14) -> Optional[float]:
-        """计算RSI指标"""
-        try:
-            delta = prices.diff()
-            gain = (delta.where(delta > 0, 0)).rolling(window=period).mean()
-            loss = (-delta.where(delta < 0, 0)).rolling(window=period).mean()
-            rs = gain / loss
-            rsi = 100 - (100 / (1 + rs))
-            return rsi.iloc[-1] if not pd.isna(rsi.iloc[-1]) else None
-        except Exception:
-            return None
-
     @staticmethod
     def _calculate_composite_score(indicators: Dict[str, Any]) -> Optional[float]:
         """计算综合得分，跳过有错误的指标"""
@@ -212,57 +244,34 @@ class CNFearGreedIndex:
         if "error" in indicators:
             return None
         
-        total_score: float = 0.0
-        total_weight: float = 0.0
-        valid_count = 0
-
-        for indicator in indicators.values():
-            # 跳过有错误的指标
-            if "error" in indicator:
-                continue
-            
-            score = safe_float(indicator.get("score"))
-            weight = safe_float(indicator.get("weight", 0))
-            
-            if score is not None and weight > 0:
-                total_score += score * weight
-                total_weight += weight
-                valid_count += 1
+        # 跳过有错误的指标，得分与权重各收集为一个数组
+        valid = [indicator for indicator in indicators.values() if "error" not in indicator]
+        scores = np.fromiter((safe_float(i.get("score")) for i in valid), dtype=np.float64, count=len(valid))
+        weights = np.fromiter((safe_float(i.get("weight", 0)) for i in valid), dtype=np.float64, count=len(valid))
+
+        # 权重为 0 的指标不参与计算
+        weights = np.where(weights > 0, weights, 0.0)
+        total_weight = weights.sum()
 
         # 如果没有有效指标，返回 None
-        if total_weight == 0 or valid_count == 0:
+        if total_weight == 0:
             return None
-        
-        return total_score / total_weight
+
+        return float(scores @ weights / total_weight)
 
     @staticmethod
     def _get_level_description(score: float) -> tuple:
         """根据分数获取等级和描述"""
-        if score >= 80:
-            return "极度贪婪", "市场情绪极度乐观，可能存在泡沫风险"
-        elif score >= 65:
-            return "贪婪", "市场情绪偏向乐观，注意风险控制"
-        elif score >= 55:
-            return "轻微贪婪", "市场情绪略显乐观"
-        elif score >= 45:
-            return "中性", "市场情绪相对平衡"
-        elif score >= 35:
-            return "轻微恐慌", "市场情绪略显悲观"
-        elif score >= 20:
-            return "恐慌", "市场情绪偏向悲观，可能存在机会"
-        else:
-            return "极度恐慌", "市场情绪极度悲观，可能是抄底时机"
+        return _LEVEL_TABLE[bisect_right(_LEVEL_THRESHOLDS, score)]
 
     @staticmethod
-    def _get_explanation() -> str:
-        """获取指数说明"""
-        return """
-恐慌贪婪指数说明：
-• 指数范围：0-100，数值越高表示市场越贪婪
-• 计算因子：价格动量(25%)、波动率(20%)、RSI(20%)、市场广度(20%)、成交量(15%)
-• 极度恐慌(0-20)：可能是买入时机
-• 恐慌(20-35)：市场悲观，谨慎观望
-• 中性(35-65)：市场情绪平衡
-• 贪婪(65-80)：市场乐观，注意风险
-• 极度贪婪(80-100)：可能存在泡沫，考虑减仓
-        """.strip()
+    def with_explanation(response: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        为 calculate 的响应附加指数说明
+
+        说明是静态文本，不写入缓存，在返回给客户端前再拼接
+        """
+        data = response.get("data")
+        if not isinstance(data, dict) or "score" not in data:
+            return response
+        return {**response, "data": {**data, "explanation": _EXPLANATION}}
@@ -6,7 +6,7 @@
 from typing import Dict, Any, List
 from ...core.cache import cached
 from ...core.config import settings
-from ...core.utils import safe_float, get_beijing_time, akshare_call_with_retry
+from ...core.utils import safe_float, get_beijing_time_str, akshare_call_with_retry, downcast_frame
 from ...core.logger import logger
 import akshare as ak  # type: ignore
 
@@ -24,6 +24,9 @@ class CNIndices:
     # 指定排序顺序
     DISPLAY_ORDER = ["sh000001", "sz399001", "sz399006", "sh000688"]
 
+    # 实际使用的列 (指数快照为宽表，拉取后立即裁剪)
+    SPOT_COLUMNS = ["代码", "最新价", "涨跌额", "涨跌幅", "成交量", "成交额"]
+
     @staticmethod
     @cached(
         "market_cn:indices",
@@ -48,11 +51,14 @@ class CNIndices:
             if df.empty:
                 raise ValueError("获取指数数据为空")
 
+            df = downcast_frame(df[CNIndices.SPOT_COLUMNS].copy(), numeric_cols=CNIndices.SPOT_COLUMNS[1:])
+
             # 过滤出核心指数
             indices_data = []
             
-            # 创建更高效的查找字典
-            df_map = df.set_index("代码").to_dict(orient="index")
+            # 先筛出关注的指数再建查找字典，只为这几行生成 dict
+            core_df = df[df["代码"].isin(CNIndices.DISPLAY_ORDER)]
+            df_map = core_df.set_index("代码").to_dict(orient="index")
             
             for code in CNIndices.DISPLAY_ORDER:
                 if code in df_map:
@@ -69,7 +75,7 @@ class CNIndices:
             
             return {
                 "indices": indices_data,
-                "update_time": get_beijing_time().strftime("%Y-%m-%d %H:%M:%S"),
+                "update_time": get_beijing_time_str(),
                 "status": "success"
             }
 
@@ -79,5 +85,5 @@ class CNIndices:
                 "error": str(e),
                 "indices": [],
                 "status": "error",
-                "update_time": get_beijing_time().strftime("%Y-%m-%d %H:%M:%S")
+                "update_time": get_beijing_time_str()
             }
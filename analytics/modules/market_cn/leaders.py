@@ -5,9 +5,10 @@
 
 from typing import Dict, Any
 import time
+import numpy as np
 from ...core.cache import cached
 from ...core.config import settings
-from ...core.utils import safe_float, get_beijing_time
+from ...core.utils import get_beijing_time_str, downcast_frame, is_trading_hours
 from ...core.data_provider import data_provider
 from ...core.logger import logger
 
@@ -15,6 +16,8 @@ from ...core.logger import logger
 class CNMarketLeaders:
     """中国市场领涨领跌股票"""
 
+    # 热力图实际使用的列 (板块表为宽表，裁剪后再遍历)
+    SECTOR_COLUMNS = ["板块名称", "涨跌幅", "总市值", "换手率", "上涨家数", "下跌家数", "领涨股票"]
 
 
 
@@ -34,25 +37,47 @@ class CNMarketLeaders:
             if df.empty:
                 raise ValueError("无法获取行业板块数据")
 
-            # 格式化所有数据
-            sectors = []
-            for _, row in df.iterrows():
-                total_companies = safe_float(row.get("上涨家数", 0)) + safe_float(
-                    row.get("下跌家数", 0)
+            df = df[[c for c in CNMarketLeaders.SECTOR_COLUMNS if c in df.columns]].copy()
+            df = downcast_frame(df, numeric_cols=CNMarketLeaders.SECTOR_COLUMNS[1:6])
+
+            # 格式化所有数据: 整列取值后按位置组装，不逐行遍历 DataFrame
+            # (数值列已在 downcast_frame 中转换，无法解析的值为 NaN，按 0 处理)
+            def numeric(col: str) -> np.ndarray:
+                if col in df.columns:
+                    return df[col].fillna(0).to_numpy(dtype=np.float64)
+                return np.zeros(len(df))
+
+            names = df["板块名称"].astype(str).tolist()
+            leads = (
+                df["领涨股票"].astype(str).tolist()
+                if "领涨股票" in df.columns
+                else [""] * len(df)
+            )
+            stock_counts = (numeric("上涨家数") + numeric("下跌家数")).astype(int).tolist()
+
+            sectors = [
+                {
+                    "name": name,
+                    "value": value,             # 用于 Treemap 面积
+                    "change_pct": change_pct,   # 用于颜色
+                    "stock_count": stock_count,
+                    "turnover": turnover,
+                    "leading_stock": lead,
+                }
+                for name, value, change_pct, stock_count, turnover, lead in zip(
+                    names,
+                    numeric("总市值").tolist(),
+                    df["涨跌幅"].fillna(0).tolist(),
+                    stock_counts,
+                    numeric("换手率").tolist(),
+                    leads,
                 )
-                sectors.append({
-                    "name": str(row["板块名称"]),
-                    "value": safe_float(row.get("总市值", 0)), # 用于 Treemap 面积
-                    "change_pct": safe_float(row["涨跌幅"]),   # 用于颜色
-                    "stock_count": int(total_companies),
-                    "turnover": safe_float(row.get("换手率", 0)),
-                    "leading_stock": str(row.get("领涨股票", "")),
-                })
+            ]
 
             return {
                 "sectors": sectors,
                 "count": len(sectors),
-                "update_time": get_beijing_time().strftime("%Y-%m-%d %H:%M:%S"),
+                "update_time": get_beijing_time_str(),
                 "market_status": CNMarketLeaders._get_market_status(),
             }
 
@@ -63,8 +88,6 @@ class CNMarketLeaders:
     @staticmethod
     def _get_market_status() -> str:
         """获取市场状态"""
-        from ...core.utils import is_trading_hours
-
         if is_trading_hours("market_cn"):
             return "交易中"
         else:
@@ -3,10 +3,11 @@ LPR 贷款市场报价利率追踪
 """
 
 import akshare as ak
+import pandas as pd
 from typing import Dict, Any, List
 from ...core.cache import cached
 from ...core.config import settings
-from ...core.utils import safe_float, get_beijing_time, akshare_call_with_retry
+from ...core.utils import get_beijing_time_str, akshare_call_with_retry
 from ...core.logger import logger
 
 
@@ -38,32 +39,38 @@ class LPRAnalysis:
             if df.empty:
                 raise ValueError("LPR 数据为空")
 
-            latest = df.iloc[-1]
-            
-            # 获取历史变化（最近 12 条记录）
-            history: List[Dict[str, Any]] = []
-            for _, row in df.tail(12).iloc[::-1].iterrows():
-                history.append({
-                    "date": str(row["TRADE_DATE"])[:10],
-                    "lpr_1y": safe_float(row.get("LPR1Y")),
-                    "lpr_5y": safe_float(row.get("LPR5Y")),
-                })
+            # 利率列统一转为数值，缺失值按 0 处理（与 safe_float 默认一致）
+            rates = (
+                df.reindex(columns=["LPR1Y", "LPR5Y"])
+                .apply(pd.to_numeric, errors="coerce")
+                .fillna(0.0)
+            )
+            dates = df["TRADE_DATE"].astype(str).str[:10]
+
+            # 获取历史变化（最近 12 条记录，倒序）
+            recent = rates.tail(12).iloc[::-1]
+            history: List[Dict[str, Any]] = (
+                recent.rename(columns={"LPR1Y": "lpr_1y", "LPR5Y": "lpr_5y"})
+                .assign(date=dates.loc[recent.index])[["date", "lpr_1y", "lpr_5y"]]
+                .to_dict("records")
+            )
 
             # 计算上一次变动
-            prev = df.iloc[-2] if len(df) >= 2 else latest
-            lpr_1y_change = safe_float(latest.get("LPR1Y")) - safe_float(prev.get("LPR1Y"))
-            lpr_5y_change = safe_float(latest.get("LPR5Y")) - safe_float(prev.get("LPR5Y"))
+            latest = rates.iloc[-1]
+            changes = rates.diff().iloc[-1].fillna(0.0)  # 仅一条记录时 diff 为 NaN，视为无变动
+            lpr_1y_change = float(changes["LPR1Y"])
+            lpr_5y_change = float(changes["LPR5Y"])
 
             return {
                 "current": {
-                    "date": str(latest["TRADE_DATE"])[:10],
-                    "lpr_1y": safe_float(latest.get("LPR1Y")),
-                    "lpr_5y": safe_float(latest.get("LPR5Y")),
+                    "date": dates.iloc[-1],
+                    "lpr_1y": float(latest["LPR1Y"]),
+                    "lpr_5y": float(latest["LPR5Y"]),
                     "lpr_1y_change": round(lpr_1y_change, 2) if lpr_1y_change != 0 else 0,
                     "lpr_5y_change": round(lpr_5y_change, 2) if lpr_5y_change != 0 else 0,
                 },
                 "history": history,
-                "update_time": get_beijing_time().strftime("%Y-%m-%d %H:%M:%S"),
+                "update_time": get_beijing_time_str(),
                 "description": "LPR 贷款市场报价利率，每月 20 日公布",
             }
 
@@ -73,5 +80,5 @@ class LPRAnalysis:
                 "error": str(e),
                 "current": None,
                 "history": [],
-                "update_time": get_beijing_time().strftime("%Y-%m-%d %H:%M:%S"),
+                "update_time": get_beijing_time_str(),
             }
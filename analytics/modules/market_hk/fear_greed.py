@@ -2,18 +2,21 @@
 import akshare as ak
 import pandas as pd
 import numpy as np
-from datetime import datetime
-from typing import Dict, Any
+from typing import Dict, Any, Tuple
 from analytics.core.cache import cached
 from analytics.core.config import settings
+from analytics.core.utils import get_beijing_time_str, akshare_call_with_retry
+from analytics.core.logger import logger
+from analytics.core.kernels import rsi_wilder
 
-def calculate_rsi(series, period=14):
-    delta = series.diff()
-    gain = (delta.where(delta > 0, 0)).rolling(window=period).mean()
-    loss = (-delta.where(delta < 0, 0)).rolling(window=period).mean()
 
-    rs = gain / loss
-    return 100 - (100 / (1 + rs))
+def _compute_indicators(close: np.ndarray) -> Tuple[float, float, float, float]:
+    """
+    All price-based inputs from one close array: (rsi_14, ma60, price, prev_close).
+    Only the latest values are needed, so MA60 is the mean of the last 60 closes.
+    """
+    return rsi_wilder(close, 14), float(close[-60:].mean()), float(close[-1]), float(close[-2])
+
 
 class HKFearGreed:
     @staticmethod
@@ -25,13 +28,14 @@ class HKFearGreed:
     def get_data() -> Dict[str, Any]:
         try:
             # 1. Fetch HSI Daily Data (for RSI and Bias)
-            df = ak.stock_hk_index_daily_sina(symbol="HSI")
+            df = akshare_call_with_retry(ak.stock_hk_index_daily_sina, symbol="HSI", max_retries=3)
             
             if df.empty or len(df) < 60:
                 raise ValueError("Insufficient historical data for HSI")
 
             # Ensure numeric
-            df['close'] = pd.to_numeric(df['close'])
+            close = pd.to_numeric(df['close']).to_numpy(dtype=np.float64)
+            current_rsi, current_ma60, current_price, prev_close = _compute_indicators(close)
             
             # --- Indicator 1: RSI (14) ---
             # Measures Momentum: >70 Overbought (Greed), <30 Oversold (Fear)
@@ -39,18 +43,12 @@ class HKFearGreed:
             # Or better: Map RSI directly to score? 
             # Classic Fear/Greed: Low RSI = Fear (Low Score), High RSI = Greed (High Score).
             # So calculating RSI directly gives us a 0-100 score base.
-            df['rsi'] = calculate_rsi(df['close'], 14)
-            current_rsi = df['rsi'].iloc[-1]
             if pd.isna(current_rsi):
                 current_rsi = 50.0
 
             # --- Indicator 2: Bias (60) ---
             # Price vs 60-day MA.
             # > +10% High Greed, < -10% High Fear.
-            df['ma60'] = df['close'].rolling(window=60).mean()
-            current_price = df['close'].iloc[-1]
-            current_ma60 = df['ma60'].iloc[-1]
-            
             # Calculate Bias%
             bias_pct = ((current_price - current_ma60) / current_ma60) * 100
             
@@ -62,7 +60,6 @@ class HKFearGreed:
 
             # --- Indicator 3: Daily Change (Market Sentiment) ---
             # 权重 30%: 让当日大跌能显著拉低分数
-            prev_close = df['close'].iloc[-2]
             change_pct = ((current_price - prev_close) / prev_close) * 100
             
             # Map Change% to 0-100
@@ -97,7 +94,7 @@ class HKFearGreed:
             return {
                 "score": final_score,
                 "level": level_cn,
-                "update_time": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+                "update_time": get_beijing_time_str(),
                 "indicators": {
                     "rsi_14": {
                         "value": round(current_rsi, 2),
@@ -122,7 +119,7 @@ class HKFearGreed:
             }
 
         except Exception as e:
-            print(f"Error calculating HK Fear/Greed: {e}")
+            logger.error(f"Error calculating HK Fear/Greed: {e}")
             return {
                 "error": str(e),
                 "status": "error"
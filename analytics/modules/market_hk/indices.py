@@ -5,7 +5,7 @@
 from typing import Dict, Any, List
 from ...core.cache import cached
 from ...core.config import settings
-from ...core.utils import safe_float, get_beijing_time, akshare_call_with_retry
+from ...core.utils import safe_float, get_beijing_time_str, akshare_call_with_retry, downcast_frame
 from ...core.logger import logger
 import akshare as ak  # type: ignore
 
@@ -33,6 +33,12 @@ class HKIndices:
 
     DISPLAY_ORDER = ["HSI", "HSTECH", "HSCEI", "HSCCI"]
 
+    # 需要查找的全部代码 (核心指数 + 板块指数)
+    WANTED_CODES = frozenset(DISPLAY_ORDER) | frozenset(SECTOR_INDICES)
+
+    # 实际使用的列 (成交额并非总是存在)
+    SPOT_COLUMNS = ["代码", "最新价", "涨跌额", "涨跌幅", "成交额"]
+
     @staticmethod
     @cached(
         "market_hk:indices",
@@ -54,8 +60,12 @@ class HKIndices:
             if df.empty:
                 raise ValueError("获取港股指数数据为空")
 
-            # 转换数据以便查找
-            df_map = df.set_index("代码").to_dict(orient="index")
+            df = df[[c for c in HKIndices.SPOT_COLUMNS if c in df.columns]].copy()
+            df = downcast_frame(df, numeric_cols=HKIndices.SPOT_COLUMNS[1:])
+
+            # 先筛出关注的指数再建查找字典，只为这几行生成 dict
+            wanted_df = df[df["代码"].isin(HKIndices.WANTED_CODES)]
+            df_map = wanted_df.set_index("代码").to_dict(orient="index")
             
             # 1. 核心指数
             indices_data = []
@@ -90,7 +100,7 @@ class HKIndices:
             sectors_data.sort(key=lambda x: x["change_pct"], reverse=True)
             
             top_gainers = sectors_data[:4] # 取前4
-            top_losers = sorted(sectors_data, key=lambda x: x["change_pct"])[:4] # 取倒数4
+            top_losers = sectors_data[-4:][::-1] # 取倒数4 (已降序，反转末尾即升序，无需再排一次)
 
             return {
                 "indices": indices_data,
@@ -99,7 +109,7 @@ class HKIndices:
                     "losers": top_losers,
                     "all": sectors_data
                 },
-                "update_time": get_beijing_time().strftime("%Y-%m-%d %H:%M:%S"),
+                "update_time": get_beijing_time_str(),
                 "status": "success"
             }
 
@@ -4,16 +4,42 @@
 """
 
 import requests
-import akshare as ak
+from bisect import bisect_right
 import pandas as pd
 import numpy as np
-from datetime import datetime
-from typing import Dict, Any, List, Optional
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Any, List, Optional
 from ...core.cache import cached
 from ...core.config import settings
-from ...core.utils import safe_float, get_beijing_time, akshare_call_with_retry
+from ...core.utils import safe_float, get_beijing_time_str
+from ...core.data_provider import data_provider
 from ...core.logger import logger
 
+# 等级查找表: 分数 >= 阈值即进入对应档位，bisect_right 得到档位下标
+_LEVEL_THRESHOLDS = (20, 35, 45, 55, 65, 80)
+_LEVEL_TABLE = (
+    ("极度恐慌", "市场情绪极度悲观"),
+    ("恐慌", "市场情绪悲观"),
+    ("轻微恐慌", "市场情绪略显悲观"),
+    ("中性", "市场情绪平衡"),
+    ("轻微贪婪", "市场情绪略显乐观"),
+    ("贪婪", "市场情绪乐观"),
+    ("极度贪婪", "市场情绪极度乐观"),
+)
+
+# 指数说明 (静态文本，模块加载时生成一次)
+_CNN_EXPLANATION = """
+CNN恐慌贪婪指数说明：
+• 指数范围：0-100，数值越高表示市场越贪婪
+• 数据来源：CNN Business官方发布
+• 更新频率：实时/每日
+""".strip()
+
+_CUSTOM_EXPLANATION = """
+自定义美国市场恐慌贪婪指数说明：
+• 基于VIX、标普500动量、市场广度、避险需求综合计算
+""".strip()
+
 
 class USFearGreedIndex:
     """美国市场恐慌贪婪指数"""
@@ -30,18 +56,21 @@ class USFearGreedIndex:
         """
         try:
             # 使用自定义计算逻辑 (基于 AkShare 的 VIX 和 SP500)
-            custom_data = USFearGreedIndex.calculate_custom_index()
-            
-            if "error" in custom_data:
+            # calculate_custom_index 自身带缓存，返回的是 {"status", "data"} 包装后的响应
+            response = USFearGreedIndex.calculate_custom_index()
+            custom_data = response.get("data")
+
+            if response.get("status") != "ok" or not isinstance(custom_data, dict) or "error" in custom_data:
+                error = (custom_data or {}).get("error") or response.get("message") or "自定义指数暂不可用"
                 return {
-                    "error": custom_data["error"], 
+                    "error": error,
                     "message": "无法获取恐慌贪婪指数 (AkShare源)",
-                    "update_time": get_beijing_time().strftime("%Y-%m-%d %H:%M:%S")
+                    "update_time": get_beijing_time_str()
                 }
 
             # 映射字段以兼容前端
-            score = custom_data.get("score", 50)
-            level = custom_data.get("level", "中性")
+            score = custom_data["score"]
+            level = custom_data["level"]
             
             # 由于是实时计算，暂时无法提供准确的 change_1d (除非有历史缓存)
             # 兼容前端：如果为 None，前端应隐藏变动显示，而不是显示 0
@@ -67,7 +96,7 @@ class USFearGreedIndex:
         return {
             "error": error_msg,
             "message": "无法获取恐慌贪婪指数",
-            "update_time": get_beijing_time().strftime("%Y-%m-%d %H:%M:%S"),
+            "update_time": get_beijing_time_str(),
         }
     @staticmethod
     @cached(
@@ -81,16 +110,22 @@ class USFearGreedIndex:
         基于VIX、标普500等指标
         """
         try:
-            vix_data = USFearGreedIndex._get_vix_data()
-            sp500_data = USFearGreedIndex._get_sp500_data()
-
-            indicators = {
-                "vix": vix_data,
-                "sp500_momentum": sp500_data,
-                "daily_change": USFearGreedIndex._get_daily_change(),
-                "market_breadth": USFearGreedIndex._get_market_breadth(),
-                "safe_haven": USFearGreedIndex._get_safe_haven_demand(),
-            }
+            # 各数据请求相互独立，并发获取 (每个指标内部自行捕获异常并返回 error)
+            # 标普500 日线 (.INX) 只请求一次，供 VIX 回退、动量、当日涨跌共用
+            with ThreadPoolExecutor(max_workers=3) as executor:
+                f_sp500 = executor.submit(data_provider.get_us_daily, ".INX")
+                f_vix = executor.submit(USFearGreedIndex._get_vix_data, f_sp500.result)
+                f_breadth = executor.submit(USFearGreedIndex._get_market_breadth)
+                vix_data = f_vix.result()
+
+                indicators = {
+                    "vix": vix_data,
+                    "sp500_momentum": USFearGreedIndex._get_sp500_data(f_sp500.result),
+                    "daily_change": USFearGreedIndex._get_daily_change(f_sp500.result),
+                    "market_breadth": f_breadth.result(),
+                    # 避险需求基于 VIX，复用上面的结果，不再重复请求
+                    "safe_haven": USFearGreedIndex._get_safe_haven_demand(vix_data),
+                }
 
             composite_score = USFearGreedIndex._calculate_composite_score(indicators)
             
@@ -100,7 +135,7 @@ class USFearGreedIndex:
                     "error": "无法获取足够的指标数据",
                     "message": "所有指标获取失败",
                     "indicators": indicators,
-                    "update_time": get_beijing_time().strftime("%Y-%m-%d %H:%M:%S"),
+                    "update_time": get_beijing_time_str(),
                 }
             
             level, description = USFearGreedIndex._get_level_description(
@@ -112,7 +147,7 @@ class USFearGreedIndex:
                 "level": level,
                 "description": description,
                 "indicators": indicators,
-                "update_time": get_beijing_time().strftime("%Y-%m-%d %H:%M:%S"),
+                "update_time": get_beijing_time_str(),
                 "explanation": USFearGreedIndex._get_custom_explanation(),
             }
 
@@ -121,19 +156,22 @@ class USFearGreedIndex:
             return {
                 "error": str(e),
                 "message": "无法计算自定义恐慌贪婪指数",
-                "update_time": get_beijing_time().strftime("%Y-%m-%d %H:%M:%S"),
+                "update_time": get_beijing_time_str(),
             }
 
     @staticmethod
-    def _get_vix_data() -> Dict[str, Any]:
+    def _get_vix_data(load_sp500: Callable[[], pd.DataFrame]) -> Dict[str, Any]:
         """
         获取 VIX 数据
         策略: 优先尝试 API (.VIX), 失败则计算标普500历史波动率作为替代
+
+        Args:
+            load_sp500: 返回标普500日线 (.INX) 的函数，仅在回退时调用
         """
         try:
             # 1. 优先尝试直接获取 VIX 数据
             try:
-                df = akshare_call_with_retry(ak.stock_us_daily, symbol=".VIX")
+                df = data_provider.get_us_daily(".VIX")
                 if not df.empty:
                     latest_vix = safe_float(df.iloc[-1]["close"])
                     if latest_vix is not None:
@@ -148,23 +186,20 @@ class USFearGreedIndex:
             # 逻辑: VIX ≈ 预期波动率，历史波动率是其良好近似
             logger.info("🔄 使用标普500波动率计算 VIX 替代值...")
             
-            # 获取标普500数据 (多取一些数据以计算滚动窗口)
-            df_sp500 = akshare_call_with_retry(ak.stock_us_daily, symbol=".INX")
+            # 获取标普500数据
+            df_sp500 = load_sp500()
             
             if df_sp500.empty or len(df_sp500) < 30:
                 return {"error": "数据不足无法计算VIX", "weight": 0.3}
 
-            # 计算对数收益率
-            df_sp500["close"] = pd.to_numeric(df_sp500["close"], errors="coerce")
-            df_sp500["log_ret"] = np.log(df_sp500["close"] / df_sp500["close"].shift(1))
-            
-            # 计算20日滚动波动率 (年化)
-            # window=20 (约一个月交易日), x 100 (百分比), x sqrt(252) (年化)
-            rolling_vol = df_sp500["log_ret"].rolling(window=20).std() * np.sqrt(252) * 100
-            
-            latest_vol = safe_float(rolling_vol.iloc[-1])
+            # 20日年化波动率: 只取末尾 21 个收盘价 (20 个对数收益率) 直接计算，
+            # 不为整段历史构造收益率和滚动窗口
+            # x 100 (百分比), x sqrt(252) (年化)
+            close = pd.to_numeric(df_sp500["close"].iloc[-21:], errors="coerce").to_numpy(dtype=np.float64)
+            log_ret = np.log(close[1:] / close[:-1])
+            latest_vol = float(np.std(log_ret, ddof=1) * np.sqrt(252) * 100)
             
-            if latest_vol is None:
+            if not np.isfinite(latest_vol):
                 return {"error": "波动率计算失败", "weight": 0.3}
 
             return USFearGreedIndex._format_vix_score(latest_vol, is_estimated=True)
@@ -174,17 +209,17 @@ class USFearGreedIndex:
             return {"error": str(e), "weight": 0.25}
 
     @staticmethod
-    def _get_daily_change() -> Dict[str, Any]:
+    def _get_daily_change(load_sp500: Callable[[], pd.DataFrame]) -> Dict[str, Any]:
         """获取标普500单日涨跌幅 (Sentiment Sensitivity)"""
         try:
-            df = akshare_call_with_retry(ak.stock_us_daily, symbol=".INX")
+            df = load_sp500()
             if df.empty or len(df) < 2:
                 return {"error": "数据不足", "weight": 0.20}
             
             # 计算单日涨跌
             # new akshare returns 'close'
-            current = df["close"].iloc[-1]
-            prev = df["close"].iloc[-2]
+            closes = df["close"].to_numpy(dtype=np.float64)
+            current, prev = closes[-1], closes[-2]
             
             change_pct = (current - prev) / prev * 100
             
@@ -232,21 +267,18 @@ class USFearGreedIndex:
 
 
     @staticmethod
-    def _get_sp500_data() -> Dict[str, Any]:
+    def _get_sp500_data(load_sp500: Callable[[], pd.DataFrame]) -> Dict[str, Any]:
         """获取标普500动量数据"""
         try:
-            # 使用 AkShare 获取标普500指数数据 (代号 .INX)
-            df = akshare_call_with_retry(ak.stock_us_daily, symbol=".INX")
+            # 标普500指数日线 (AkShare 代号 .INX)
+            df = load_sp500()
             if df.empty or len(df) < 20:
                 return {"error": "数据不足", "weight": 0.25}
             
-            # 计算20日动量 (新接口返回英文列名: close)
-            recent = df.tail(20)
-            momentum_pct = (
-                (recent["close"].iloc[-1] - recent["close"].iloc[0])
-                / recent["close"].iloc[0]
-                * 100
-            )
+            # 计算20日动量 (新接口返回英文列名: close)，直接按位置读取收盘价
+            closes = df["close"].to_numpy(dtype=np.float64)
+            first, last = closes[-20], closes[-1]
+            momentum_pct = (last - first) / first * 100.0
             
             # 动量转换为分数 (涨5%=75, 涨10%=100, 跌5%=25)
             score = min(100, max(0, 50 + momentum_pct * 5))
@@ -268,15 +300,17 @@ class USFearGreedIndex:
         """
         try:
             # 获取道琼斯(.DJI)和纳斯达克(.IXIC)
-            dji = akshare_call_with_retry(ak.stock_us_daily, symbol=".DJI")
-            ndx = akshare_call_with_retry(ak.stock_us_daily, symbol=".IXIC") # 纳斯达克综合
+            dji = data_provider.get_us_daily(".DJI")
+            ndx = data_provider.get_us_daily(".IXIC") # 纳斯达克综合
             
             if dji.empty or ndx.empty:
                 return {"error": "数据不足", "weight": 0.2}
             
             # 比较近5日表现 (新接口返回英文列名: close)
-            dji_change = (dji["close"].iloc[-1] - dji["close"].iloc[-5]) / dji["close"].iloc[-5] * 100
-            ndx_change = (ndx["close"].iloc[-1] - ndx["close"].iloc[-5]) / ndx["close"].iloc[-5] * 100
+            dji_close = dji["close"].to_numpy(dtype=np.float64)
+            ndx_close = ndx["close"].to_numpy(dtype=np.float64)
+            dji_change = (dji_close[-1] - dji_close[-5]) / dji_close[-5] * 100
+            ndx_change = (ndx_close[-1] - ndx_close[-5]) / ndx_close[-5] * 100
             
             # 如果大盘股(道琼斯)和成长股(纳斯达克)同涨=贪婪, 同跌=恐慌
             avg_change = (dji_change + ndx_change) / 2
@@ -293,14 +327,19 @@ class USFearGreedIndex:
             return {"error": str(e), "weight": 0.15}
 
     @staticmethod
-    def _get_safe_haven_demand() -> Dict[str, Any]:
+    def _get_safe_haven_demand(vix_data: Dict[str, Any]) -> Dict[str, Any]:
         """
         获取避险需求数据
         使用 VIX 作为主要参考指标
+
+        Args:
+            vix_data: _get_vix_data 的结果
         """
         try:
-            vix_data = USFearGreedIndex._get_vix_data()
-            vix_score = vix_data.get("score", 50)
+            # VIX 不可用时避险需求同样不可用 (不填充假数据)
+            if "error" in vix_data:
+                return {"error": vix_data["error"], "weight": 0.20}
+            vix_score = vix_data["score"]
             
             # VIX越高(恐慌)，避险需求越高，这应该贡献给"恐慌"分数(低分)
             # 所以直接复用 VIX 的分数即可
@@ -318,58 +357,30 @@ class USFearGreedIndex:
     @staticmethod
     def _calculate_composite_score(indicators: Dict[str, Any]) -> Optional[float]:
         """计算综合得分，跳过有错误的指标"""
-        total_score: float = 0.0
-        total_weight: float = 0.0
-        valid_count = 0
-        
-        for indicator in indicators.values():
-            # 跳过有错误的指标
-            if "error" in indicator:
-                continue
-            
-            score = safe_float(indicator.get("score"))
-            weight = safe_float(indicator.get("weight", 0))
-            
-            if score is not None and weight > 0:
-                total_score += score * weight
-                total_weight += weight
-                valid_count += 1
-        
+        # 跳过有错误的指标，得分与权重各收集为一个数组
+        valid = [indicator for indicator in indicators.values() if "error" not in indicator]
+        scores = np.fromiter((safe_float(i.get("score")) for i in valid), dtype=np.float64, count=len(valid))
+        weights = np.fromiter((safe_float(i.get("weight", 0)) for i in valid), dtype=np.float64, count=len(valid))
+
+        # 权重为 0 的指标不参与计算
+        weights = np.where(weights > 0, weights, 0.0)
+        total_weight = weights.sum()
+
         # 如果没有有效指标，返回 None 而非假数据
-        if total_weight == 0 or valid_count == 0:
+        if total_weight == 0:
             return None
-        
-        return total_score / total_weight
+
+        return float(scores @ weights / total_weight)
 
     @staticmethod
     def _get_level_description(score: float) -> tuple:
-        if score >= 80:
-            return "极度贪婪", "市场情绪极度乐观"
-        elif score >= 65:
-            return "贪婪", "市场情绪乐观"
-        elif score >= 55:
-            return "轻微贪婪", "市场情绪略显乐观"
-        elif score >= 45:
-            return "中性", "市场情绪平衡"
-        elif score >= 35:
-            return "轻微恐慌", "市场情绪略显悲观"
-        elif score >= 20:
-            return "恐慌", "市场情绪悲观"
-        else:
-            return "极度恐慌", "市场情绪极度悲观"
+        """根据分数获取等级和描述"""
+        return _LEVEL_TABLE[bisect_right(_LEVEL_THRESHOLDS, score)]
 
     @staticmethod
     def _get_cnn_explanation() -> str:
-        return """
-CNN恐慌贪婪指数说明：
-• 指数范围：0-100，数值越高表示市场越贪婪
-• 数据来源：CNN Business官方发布
-• 更新频率：实时/每日
-        """.strip()
+        return _CNN_EXPLANATION
 
     @staticmethod
     def _get_custom_explanation() -> str:
-        return """
-自定义美国市场恐慌贪婪指数说明：
-• 基于VIX、标普500动量、市场广度、避险需求综合计算
-        """.strip()
+        return _CUSTOM_EXPLANATION
@@ -6,13 +6,51 @@ Desc: 美债收益率分析
 """
 
 import akshare as ak
+import numpy as np
 import pandas as pd
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Callable, Tuple
 from ...core.cache import cached
 from ...core.config import settings
 from ...core.utils import akshare_call_with_retry
 from ...core.logger import logger
 
+# 关注的期限 (2年 / 10年 / 30年)
+_YIELD_COLUMNS = ("美国国债收益率2年", "美国国债收益率10年", "美国国债收益率30年")
+
+# 智能分析规则: (条件, 结论) 按顺序匹配，最后一条条件恒为真作为默认结论
+# 结论 dict 在模块加载时生成一次，各请求共享 (只读)
+_SPREAD_RULES = (
+    (lambda val: val < -0.5, {"text": "深度倒挂：强烈的衰退预警", "level": "danger"}),
+    (lambda val: val < 0, {"text": "曲线倒挂：经济衰退风险较高", "level": "warning"}),
+    (lambda val: val < 0.2, {"text": "利差收窄：经济前景趋弱", "level": "neutral"}),
+    (lambda val: True, {"text": "形态正常：经济增长预期稳健", "level": "good"}),
+)
+
+_2Y_RULES = (
+    (lambda val, change: val > 5.0, {"text": "紧缩高压：降息预期显著降温", "level": "warning"}),
+    (lambda val, change: change > 0.1, {"text": "短端承压：由于政策预期收紧", "level": "warning"}),
+    (lambda val, change: change < -0.1, {"text": "降息交易：市场押注政策转向", "level": "neutral"}),
+    (lambda val, change: True, {"text": "跟随政策利率波动", "level": "neutral"}),
+)
+
+_10Y_RULES = (
+    (lambda val, change: val > 4.5, {"text": "利率高企：压制全球资产估值", "level": "danger"}),
+    (lambda val, change: change > 0.1, {"text": "快速上行：通胀担忧重燃", "level": "warning"}),
+    (lambda val, change: val < 3.5, {"text": "处于舒适区：利好成长股", "level": "good"}),
+    (lambda val, change: True, {"text": "全球资产定价之锚", "level": "neutral"}),
+)
+
+_30Y_RULES = (
+    (lambda val, diff_10y: val > 4.8, {"text": "长期通胀预期脱锚风险", "level": "warning"}),
+    (lambda val, diff_10y: diff_10y > 0.5, {"text": "期限溢价走阔", "level": "neutral"}),
+    (lambda val, diff_10y: True, {"text": "反映长期经济增长预期", "level": "neutral"}),
+)
+
+
+def _match_rule(rules: Tuple[Tuple[Callable[..., bool], Dict[str, Any]], ...], *args: float) -> Dict[str, Any]:
+    """返回第一条满足条件的规则结论"""
+    return next(result for condition, result in rules if condition(*args))
+
 
 class USTreasury:
     """美债收益率分析"""
@@ -34,88 +72,25 @@ class USTreasury:
             if df.empty:
                 return []
 
-            latest = df.iloc[-1]
+            # 一次性取出末尾两行的三个期限 (缺失列/值按 0 处理)
+            rates = (
+                df.reindex(columns=list(_YIELD_COLUMNS))
+                .iloc[-2:]
+                .apply(pd.to_numeric, errors="coerce")
+                .to_numpy(dtype=np.float64)
+            )
+            rates = np.nan_to_num(rates, nan=0.0)
+            current = rates[-1]
+            prev = rates[-2] if len(rates) > 1 else np.zeros_like(current)
 
             # 提取数据
-            us_2y = (
-                float(latest["美国国债收益率2年"])
-                if "美国国债收益率2年" in latest
-                and pd.notna(latest["美国国债收益率2年"])
-                else 0
-            )
-            us_10y = (
-                float(latest["美国国债收益率10年"])
-                if "美国国债收益率10年" in latest
-                and pd.notna(latest["美国国债收益率10年"])
-                else 0
-            )
-            us_30y = (
-                float(latest["美国国债收益率30年"])
-                if "美国国债收益率30年" in latest
-                and pd.notna(latest["美国国债收益率30年"])
-                else 0
-            )
+            us_2y, us_10y, us_30y = current.tolist()
 
             # 计算利差 (倒挂)
             inversion = us_10y - us_2y
 
-            # 获取前一日数据计算变动
-            prev_10y = 0.0
-            prev_2y = 0.0
-            prev_30y = 0.0
-            
-            if len(df) > 1:
-                prev = df.iloc[-2]
-                if "美国国债收益率10年" in prev and pd.notna(prev["美国国债收益率10年"]):
-                    prev_10y = float(prev["美国国债收益率10年"])
-                if "美国国债收益率2年" in prev and pd.notna(prev["美国国债收益率2年"]):
-                    prev_2y = float(prev["美国国债收益率2年"])
-                if "美国国债收益率30年" in prev and pd.notna(prev["美国国债收益率30年"]):
-                    prev_30y = float(prev["美国国债收益率30年"])
-            
-            change_10y = us_10y - prev_10y if prev_10y > 0 else 0.0
-            change_2y = us_2y - prev_2y if prev_2y > 0 else 0.0
-            change_30y = us_30y - prev_30y if prev_30y > 0 else 0.0
-
-            # 智能分析生成 - 针对每个指标分别分析
-            
-            def analyze_spread(val: float) -> Dict[str, Any]:
-                if val < -0.5:
-                    return {"text": "深度倒挂：强烈的衰退预警", "level": "danger"}
-                elif val < 0:
-                    return {"text": "曲线倒挂：经济衰退风险较高", "level": "warning"}
-                elif val < 0.2:
-                    return {"text": "利差收窄：经济前景趋弱", "level": "neutral"}
-                else:
-                    return {"text": "形态正常：经济增长预期稳健", "level": "good"}
-
-            def analyze_2y(val: float, change: float) -> Dict[str, Any]:
-                if val > 5.0:
-                    return {"text": "紧缩高压：降息预期显著降温", "level": "warning"}
-                elif change > 0.1:
-                    return {"text": "短端承压：由于政策预期收紧", "level": "warning"}
-                elif change < -0.1:
-                    return {"text": "降息交易：市场押注政策转向", "level": "neutral"}
-                else:
-                    return {"text": "跟随政策利率波动", "level": "neutral"}
-
-            def analyze_10y(val: float, change: float) -> Dict[str, Any]:
-                if val > 4.5:
-                    return {"text": "利率高企：压制全球资产估值", "level": "danger"}
-                elif change > 0.1:
-                    return {"text": "快速上行：通胀担忧重燃", "level": "warning"}
-                elif val < 3.5:
-                    return {"text": "处于舒适区：利好成长股", "level": "good"}
-                else:
-                    return {"text": "全球资产定价之锚", "level": "neutral"}
-
-            def analyze_30y(val: float, diff_10y: float) -> Dict[str, Any]:
-                if val > 4.8:
-                    return {"text": "长期通胀预期脱锚风险", "level": "warning"}
-                elif diff_10y > 0.5:
-                    return {"text": "期限溢价走阔", "level": "neutral"}
-                else:
-                    return {"text": "反映长期经济增长预期", "level": "neutral"}
+            # 与前一日比较计算变动 (前值缺失时变动记为 0)
+            change_2y, change_10y, change_30y = np.where(prev > 0, current - prev, 0.0).tolist()
 
             metrics = [
                 {
@@ -123,34 +98,34 @@ class USTreasury:
                     "value": round(inversion, 3),
                     "suffix": "%",
                     "is_spread": True,
-                    "analysis": analyze_spread(inversion)
+                    "analysis": _match_rule(_SPREAD_RULES, inversion)
                 },
                 {
                     "name": "2年期美债",
                     "value": us_2y,
                     "suffix": "%",
                     "change": round(change_2y, 2),
-                    "analysis": analyze_2y(us_2y, change_2y)
+                    "analysis": _match_rule(_2Y_RULES, us_2y, change_2y)
                 },
                 {
                     "name": "10年期美债",
                     "value": us_10y,
                     "suffix": "%", 
                     "change": round(change_10y, 2),
-                    "analysis": analyze_10y(us_10y, change_10y)
+                    "analysis": _match_rule(_10Y_RULES, us_10y, change_10y)
                 },
                 {
                     "name": "30年期美债",
                     "value": us_30y,
                     "suffix": "%",
                     "change": round(change_30y, 2),
-                    "analysis": analyze_30y(us_30y, us_30y - us_10y)
+                    "analysis": _match_rule(_30Y_RULES, us_30y, us_30y - us_10y)
                 },
             ]
 
             return {
                 "metrics": metrics,
-                "timestamp": latest.get("日期", str(pd.Timestamp.now().date()))
+                "timestamp": df["日期"].iloc[-1] if "日期" in df.columns else str(pd.Timestamp.now().date())
             }
 
         except Exception as e:
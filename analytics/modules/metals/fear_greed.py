@@ -203,12 +203,16 @@ class BaseMetalFearGreedIndex:
 
     @staticmethod
     def _calculate_rsi(series: pd.Series, period: int = 14) -> Optional[float]:
-        delta = series.diff()
-        gain = (delta.where(delta > 0, 0)).rolling(window=period).mean()
-        loss = (-delta.where(delta < 0, 0)).rolling(window=period).mean()
-        rs = gain / loss
-        rsi = 100 - (100 / (1 + rs))
-        return rsi.iloc[-1] if not pd.isna(rsi.iloc[-1]) else None
+        # 只需要最后一期 RSI: 直接对末尾 period 个差值求均值，无需构造 rolling 对象
+        prices = series.to_numpy(dtype=np.float64)[-(period + 1):]
+        if prices.shape[0] < period + 1:
+            return None
+        delta = np.diff(prices)
+        gain = np.where(delta > 0, delta, 0.0).mean()
+        loss = np.where(delta < 0, -delta, 0.0).mean()
+        if loss == 0:
+            return 100.0 if gain > 0 else None
+        return float(100 - 100 / (1 + gain / loss))
 
     @staticmethod
     def _calculate_composite_score(indicators: Dict[str, Any]) -> Optional[float]:
@@ -47,14 +47,21 @@ class GoldSilverAnalysis:
             if df.empty:
                 return {"error": "无法获取期货数据", "ratio": {"current": 0}}
 
-            # 获取黄金数据
-            gold_row = df[df["代码"] == GoldSilverAnalysis.GOLD_CODE]
-            silver_row = df[df["代码"] == GoldSilverAnalysis.SILVER_CODE]
+            # 获取黄金数据 (代码 → 行位置，两次查找共用一次扫描；代码重复时取首行)
+            code_pos: Dict[str, int] = {}
+            for i, c in enumerate(df["代码"].to_numpy()):
+                code_pos.setdefault(c, i)
+            gold_idx = code_pos.get(GoldSilverAnalysis.GOLD_CODE)
+            silver_idx = code_pos.get(GoldSilverAnalysis.SILVER_CODE)
 
             # 备用合约代码
-            if gold_row.empty:
+            if gold_idx is not None:
+                gold_row = df.iloc[[gold_idx]]
+            else:
                 gold_row = df[df["代码"].str.contains("GC2", na=False)].head(1)
-            if silver_row.empty:
+            if silver_idx is not None:
+                silver_row = df.iloc[[silver_idx]]
+            else:
                 silver_row = df[df["代码"].str.contains("SI2", na=False)].head(1)
 
             if gold_row.empty or silver_row.empty:
@@ -42,6 +42,11 @@ class MetalSpotPrice:
                 logger.info("❌ 无法获取期货数据")
                 return []
 
+            # 代码 → 行位置，避免每个合约都对整列做一次布尔掩码 (代码重复时取首行)
+            code_pos: Dict[str, int] = {}
+            for i, c in enumerate(df["代码"].to_numpy()):
+                code_pos.setdefault(c, i)
+
             for metal in MetalSpotPrice.METALS:
                 try:
                     code = metal["code"]
@@ -49,18 +54,18 @@ class MetalSpotPrice:
                     unit = metal["unit"]
 
                     # 查找合约
-                    row = df[df["代码"] == code]
-
-                    # 备用: 尝试模糊匹配
-                    if row.empty:
+                    if code in code_pos:
+                        data = df.iloc[code_pos[code]]
+                    else:
+                        # 备用: 尝试模糊匹配
                         prefix = code[:2]  # GC, SI, HG, PL, PA
                         row = df[df["代码"].str.startswith(prefix, na=False)].head(1)
 
-                    if row.empty:
-                        logger.warning(f" 未找到 {name} ({code})")
-                        continue
+                        if row.empty:
+                            logger.warning(f" 未找到 {name} ({code})")
+                            continue
 
-                    data = row.iloc[0]
+                        data = row.iloc[0]
                     price = safe_float(data["最新价"])
                     change_pct = safe_float(data["涨跌幅"])
 
@@ -31,8 +31,9 @@ async def lifespan(app: FastAPI):
         logger.info(f"✅ Redis 已连接: {cache.redis_url}")
 
         # 启动后台初始预热（非阻塞）
-        warmup_thread = threading.Thread(target=initial_warmup, daemon=True)
-        warmup_thread.start()
+        if settings.WARM_CACHE_ON_STARTUP:
+            warmup_thread = threading.Thread(target=initial_warmup, daemon=True)
+            warmup_thread.start()
 
         # 设置并启动调度器
         setup_default_jobs()